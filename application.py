@@ -13,6 +13,7 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_talisman import Talisman
 
 from config.environment import db_URI
+from lib.compression import compress_response
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -45,7 +46,11 @@ limiter = Limiter(
 # Mail configuration (optional: app starts without it; mail routes will fail until set)
 app.config["MAIL_SERVER"] = os.getenv("MAIL_SERVER", "localhost")
 app.config["MAIL_PORT"] = int(os.getenv("MAIL_PORT", "25"))
-app.config["MAIL_USE_TLS"] = True
+app.config["MAIL_USE_TLS"] = os.getenv("MAIL_USE_TLS", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
 app.config["MAIL_USERNAME"] = os.getenv("MAIL_USERNAME") or ""
 app.config["MAIL_PASSWORD"] = os.getenv("MAIL_PASSWORD") or ""
 
@@ -64,6 +69,8 @@ from controllers import content_controller
 from controllers import carousels_controller
 from controllers import menus_controller
 from controllers import grid_controller
+from lib import snapshots  # publishes static JSON after writes when SNAPSHOT_DIR is set
+from lib.passwords import HasherBusy
 
 
 @app.before_request
@@ -76,6 +83,9 @@ def log_request_info():
     logger.info("Headers: %s", safe_headers)
 
 
+app.after_request(compress_response)
+
+
 @app.after_request
 def log_response_info(response):
     """Log response information."""
@@ -109,6 +119,15 @@ def internal_error(error):
     return jsonify({"error": "Internal server error"}), 500
 
 
+@app.errorhandler(HasherBusy)
+def hasher_busy(error):
+    """Shed password checks while the bcrypt pool is saturated."""
+    logger.warning("Password hashing busy: %s", error)
+    response = jsonify({"error": "Server busy, please try again"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+
 @app.errorhandler(Exception)
 def handle_exception(e):
     """Log unhandled exception."""
@@ -0,0 +1,437 @@
+"""
+Benchmarks for the API's database access paths.
+
+Run against a seeded scratch database, e.g.:
+    DATABASE_URL=sqlite:///bench.db python seed.py
+    DATABASE_URL=sqlite:///bench.db python benchmark.py sections
+
+scheduler_workers checks that concurrent scheduler workers apply every due
+menu version exactly once; point DATABASE_URL at a local Postgres to exercise
+SKIP LOCKED claiming.
+"""
+
+import logging
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event, insert
+
+from application import app, db, limiter
+from models import (
+    ContentModel,
+    CONTENT_SECTIONS,
+    CarouselModel,
+    MenusModel,
+    GridModel,
+)
+from models.content_model import LOADER_STRATEGIES
+from controllers.content_controller import load_section
+from lib.bulk import bulk_update
+from lib.compression import supported_encodings
+from lib.cache import content_cache
+from lib.menu_schedule import apply_due, bst_now, due_versions
+from lib.passwords import hasher
+from models.menu_schedule_model import MenuScheduleModel
+from models.users_model import UserModel
+
+
+class StatementRecorder:
+    """Records every SQL statement issued while active."""
+
+    def __init__(self):
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        event.listen(db.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(db.engine, "before_cursor_execute", self._record)
+
+    def fetched(self):
+        """Re-run the recorded statements and return (rows, bytes) they fetch."""
+        rows = size = 0
+        with db.engine.connect() as conn:
+            for statement, parameters in self.statements:
+                for row in conn.exec_driver_sql(statement, parameters).fetchall():
+                    rows += 1
+                    size += sum(len(str(value)) for value in row if value is not None)
+        return rows, size
+
+
+def measure(fn, repeat=200):
+    """Return (queries, rows, bytes, avg ms) for ``fn``."""
+    db.session.expunge_all()
+    with StatementRecorder() as recorder:
+        fn()
+    rows, size = recorder.fetched()
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        db.session.expunge_all()
+        fn()
+    elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+    return len(recorder.statements), rows, size, elapsed_ms
+
+
+def bench_sections(content_id=1):
+    """Compare full-entity section reads with the registry's column projection."""
+    print(
+        f"{'section':<14}{'strategy':<10}{'queries':>8}{'rows':>6}"
+        f"{'bytes':>8}{'ms':>8}"
+    )
+    for section in CONTENT_SECTIONS:
+
+        def before(section=section):
+            content = db.session.query(ContentModel).get(content_id)
+            return {name: getattr(content, name) for name in CONTENT_SECTIONS[section]}
+
+        def after(section=section):
+            return load_section(content_id, section)
+
+        for label, fn in (("before", before), ("after", after)):
+            queries, rows, size, elapsed_ms = measure(fn)
+            print(
+                f"{section:<14}{label:<10}{queries:>8}{rows:>6}"
+                f"{size:>8}{elapsed_ms:>8.2f}"
+            )
+
+
+def seed_bench_content(children):
+    """Insert a throwaway content row with ``children`` of each child type."""
+    content = ContentModel(
+        **{
+            column.name: "bench"
+            for column in ContentModel.__table__.columns
+            if isinstance(column.type, db.Text)
+        }
+    )
+    content.carousels = [
+        CarouselModel(carousel_url=f"bench-{i}") for i in range(children)
+    ]
+    content.menus = [
+        MenusModel(menus_type=f"bench-{i}", menus_text="bench", menus_url="bench")
+        for i in range(children)
+    ]
+    content.grid = [
+        GridModel(grid_url=f"bench-{i}", position=i, height=1, width=1)
+        for i in range(children)
+    ]
+    db.session.add(content)
+    db.session.commit()
+    return content.id
+
+
+def delete_bench_content(content_id):
+    """Remove a row created by seed_bench_content along with its children."""
+    db.session.expunge_all()
+    for model in (CarouselModel, MenusModel, GridModel):
+        db.session.query(model).filter_by(content_id=content_id).delete()
+    db.session.query(ContentModel).filter_by(id=content_id).delete()
+    db.session.commit()
+
+
+def bench_loading(child_counts=(2, 5, 10, 20)):
+    """Time and memory of each relationship loading strategy as children grow."""
+    print(
+        f"{'children':>8}  {'strategy':<10}{'queries':>8}{'rows':>7}"
+        f"{'ms':>9}{'peak KiB':>10}"
+    )
+    for children in child_counts:
+        content_id = seed_bench_content(children)
+        try:
+            for strategy in LOADER_STRATEGIES:
+
+                def load(strategy=strategy):
+                    content = (
+                        db.session.query(ContentModel)
+                        .options(*ContentModel.load_children(strategy))
+                        .filter(ContentModel.id == content_id)
+                        .one()
+                    )
+                    return len(content.carousels) + len(content.menus) + len(
+                        content.grid
+                    )
+
+                queries, rows, _, elapsed_ms = measure(load, repeat=20)
+                db.session.expunge_all()
+                tracemalloc.start()
+                load()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(
+                    f"{children:>8}  {strategy:<10}{queries:>8}{rows:>7}"
+                    f"{elapsed_ms:>9.2f}{peak / 1024:>10.1f}"
+                )
+        finally:
+            delete_bench_content(content_id)
+
+
+def bench_compression(paths=("/api/content", "/api/content/1/bundle"), repeat=200):
+    """Response size and latency per encoding, cold and from the cache."""
+    limiter.enabled = False
+    logging.getLogger("application").setLevel(logging.WARNING)
+    client = app.test_client()
+    print(f"{'path':<24}{'encoding':<10}{'bytes':>8}{'cold ms':>9}{'warm ms':>9}")
+    for path in paths:
+        for encoding in ["identity", *supported_encodings()]:
+            headers = {"Accept-Encoding": encoding}
+            content_cache.bump()
+            start = time.perf_counter()
+            response = client.get(path, headers=headers, base_url="https://localhost")
+            cold_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                client.get(path, headers=headers, base_url="https://localhost")
+            warm_ms = (time.perf_counter() - start) * 1000 / repeat
+            print(
+                f"{path:<24}{encoding:<10}{len(response.data):>8}"
+                f"{cold_ms:>9.2f}{warm_ms:>9.2f}"
+            )
+
+
+def bench_bulk_update(sizes=(100, 1000), repeat=5):
+    """Per-item lookups against one set-based UPDATE for bulk carousel saves."""
+    print(f"{'items':>6}  {'approach':<10}{'queries':>8}{'ms':>9}")
+    for size in sizes:
+        content_id = seed_bench_content(size)
+        ids = [
+            carousel_id
+            for (carousel_id,) in db.session.query(CarouselModel.id).filter_by(
+                content_id=content_id
+            )
+        ]
+        try:
+
+            def per_item(run):
+                for carousel_id in ids:
+                    carousel = CarouselModel.query.filter_by(
+                        id=carousel_id, content_id=content_id
+                    ).first()
+                    carousel.carousel_url = f"bench-{run}-{carousel_id}"
+                db.session.commit()
+
+            def set_based(run):
+                bulk_update(
+                    CarouselModel,
+                    {key: {"carousel_url": f"bench-{run}-{key}"} for key in ids},
+                    CarouselModel.content_id == content_id,
+                )
+                db.session.commit()
+
+            for label, fn in (("per-item", per_item), ("set-based", set_based)):
+                db.session.expunge_all()
+                with StatementRecorder() as recorder:
+                    fn(0)
+                start = time.perf_counter()
+                for run in range(1, repeat + 1):
+                    db.session.expunge_all()
+                    fn(run)
+                elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+                print(
+                    f"{size:>6}  {label:<10}{len(recorder.statements):>8}"
+                    f"{elapsed_ms:>9.2f}"
+                )
+        finally:
+            delete_bench_content(content_id)
+
+
+def bench_apply_due(sizes=(100, 1000)):
+    """Per-row ORM application of due menu versions against ``apply_due``."""
+    print(f"{'due':>6}  {'approach':<10}{'queries':>8}{'ms':>9}")
+    for size in sizes:
+        content_id = seed_bench_content(size)
+        menu_ids = [
+            menu_id
+            for (menu_id,) in db.session.query(MenusModel.id).filter_by(
+                content_id=content_id
+            )
+        ]
+        now = bst_now()
+        try:
+
+            def per_row():
+                for version, menu in due_versions(now, content_id):
+                    menu.menus_text = version.menus_text
+                    version.applied = True
+                db.session.commit()
+
+            def set_based():
+                apply_due(now, content_id)
+                db.session.commit()
+
+            for label, fn in (("per-row", per_row), ("set-based", set_based)):
+                db.session.execute(
+                    insert(MenuScheduleModel),
+                    [
+                        {"menu_id": menu_id, "menus_text": label, "due_at": now}
+                        for menu_id in menu_ids
+                    ],
+                )
+                db.session.commit()
+                db.session.expunge_all()
+                start = time.perf_counter()
+                with StatementRecorder() as recorder:
+                    fn()
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                print(
+                    f"{size:>6}  {label:<10}{len(recorder.statements):>8}"
+                    f"{elapsed_ms:>9.2f}"
+                )
+        finally:
+            db.session.query(MenuScheduleModel).filter(
+                MenuScheduleModel.menu_id.in_(menu_ids)
+            ).delete(synchronize_session=False)
+            delete_bench_content(content_id)
+
+
+def bench_scheduler_workers(workers=(1, 2, 4, 8), menus=1000, versions=20, batch=100):
+    """Throughput of N claiming scheduler workers, checking exactly-once application.
+
+    Every menu gets ``versions`` due versions (``menus * versions`` rows in
+    all). Workers drain them concurrently through ``apply_due``, ``batch``
+    menus per transaction; afterwards
+    each version must have been claimed by exactly one worker and each menu
+    must show its latest version. Run it against Postgres to exercise
+    ``SKIP LOCKED``; SQLite serializes the workers.
+    """
+    logging.getLogger("application").setLevel(logging.ERROR)
+    print(f"{'workers':>8}{'rows':>8}{'ms':>10}{'rows/s':>10}")
+    for count in workers:
+        content_id = seed_bench_content(menus)
+        menu_ids = [
+            menu_id
+            for (menu_id,) in db.session.query(MenusModel.id).filter_by(
+                content_id=content_id
+            )
+        ]
+        now = bst_now()
+        db.session.execute(
+            insert(MenuScheduleModel),
+            [
+                {
+                    "menu_id": menu_id,
+                    "menus_text": f"v{version}",
+                    "due_at": now - timedelta(seconds=versions - version),
+                }
+                for menu_id in menu_ids
+                for version in range(versions)
+            ],
+        )
+        db.session.commit()
+
+        def worker():
+            claimed_ids = []
+            with app.app_context():
+                while True:
+                    claimed, _ = apply_due(now, content_id, limit=batch)
+                    db.session.commit()
+                    if not claimed:
+                        return claimed_ids
+                    claimed_ids.extend(claimed)
+
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=count) as pool:
+                results = list(pool.map(lambda _: worker(), range(count)))
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            claims = Counter(version_id for ids in results for version_id in ids)
+            duplicates = [key for key, seen in claims.items() if seen > 1]
+            db.session.expire_all()
+            pending = (
+                db.session.query(MenuScheduleModel)
+                .filter(
+                    MenuScheduleModel.menu_id.in_(menu_ids),
+                    MenuScheduleModel.applied.is_(False),
+                )
+                .count()
+            )
+            stale = (
+                db.session.query(MenusModel)
+                .filter(
+                    MenusModel.content_id == content_id,
+                    MenusModel.menus_text != f"v{versions - 1}",
+                )
+                .count()
+            )
+            if duplicates or pending or stale or len(claims) != menus * versions:
+                raise AssertionError(
+                    f"{count} workers: {len(duplicates)} versions applied twice, "
+                    f"{pending} left pending, {stale} menus not at their latest "
+                    f"version, {len(claims)} of {menus * versions} claimed"
+                )
+            rate = len(claims) / (elapsed_ms / 1000)
+            print(f"{count:>8}{len(claims):>8}{elapsed_ms:>10.1f}{rate:>10.0f}")
+        finally:
+            db.session.query(MenuScheduleModel).filter(
+                MenuScheduleModel.menu_id.in_(menu_ids)
+            ).delete(synchronize_session=False)
+            delete_bench_content(content_id)
+    print("each version applied exactly once")
+
+
+def bench_login(concurrency=(1, 4, 16, 32), logins=32):
+    """Login throughput and shed requests under concurrent bursts."""
+    limiter.enabled = False
+    logging.getLogger("application").setLevel(logging.ERROR)
+    password = "Bench-pass1!"
+    user = UserModel(
+        firstname="Bench",
+        lastname="Bench",
+        username="bench-login",
+        email="bench-login@example.com",
+        password=password,
+    )
+    db.session.add(user)
+    db.session.commit()
+    credentials = {"username": user.username, "password": password}
+
+    def login(_):
+        client = app.test_client()
+        return client.post(
+            "/api/login", json=credentials, base_url="https://localhost"
+        ).status_code
+
+    print(f"bcrypt cost {hasher.rounds}")
+    print(f"{'threads':>8}{'logins/s':>10}{'ok':>6}{'503':>6}")
+    try:
+        for threads in concurrency:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                statuses = Counter(pool.map(login, range(logins)))
+            elapsed = time.perf_counter() - start
+            print(
+                f"{threads:>8}{statuses[200] / elapsed:>10.1f}"
+                f"{statuses[200]:>6}{statuses[503]:>6}"
+            )
+    finally:
+        db.session.query(UserModel).filter_by(id=user.id).delete()
+        db.session.commit()
+
+
+BENCHMARKS = {
+    "sections": bench_sections,
+    "loading": bench_loading,
+    "compression": bench_compression,
+    "bulk_update": bench_bulk_update,
+    "login": bench_login,
+    "apply_due": bench_apply_due,
+    "scheduler_workers": bench_scheduler_workers,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    with app.app_context():
+        for name in names:
+            print(f"=== {name} ===")
+            BENCHMARKS[name]()
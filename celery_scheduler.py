@@ -1,12 +1,12 @@
 """
 Celery scheduler for applying scheduled menu updates
 """
-from datetime import datetime
 import logging
 from celery import Celery
-from sqlalchemy.exc import SQLAlchemyError
 from application import app, db
-from models.menus_model import MenusModel
+from config.environment import SCHEDULER_BATCH_SIZE
+from lib.cache import content_cache
+from lib.menu_schedule import apply_due, bst_now
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -32,47 +32,32 @@ def apply_scheduled_updates():
     """Celery task to check for and apply scheduled menu updates"""
     with app.app_context():
         try:
-            now = datetime.now()
-
-            # Find all scheduled updates that are due and not yet applied
-            scheduled_menus = MenusModel.query.filter(
-                MenusModel.scheduled_at <= now,
-                MenusModel.applied.is_(False),
-                MenusModel.scheduled_at.isnot(None),
-            ).all()
-
-            if not scheduled_menus:
-                logger.info("No scheduled updates to apply")
-
-            logger.info("Found %s scheduled updates to apply", len(scheduled_menus))
-
-            for menu in scheduled_menus:
-                try:
-                    # Apply the scheduled changes
-                    if menu.scheduled_text:
-                        menu.menus_text = menu.scheduled_text
-                    if menu.scheduled_url:
-                        menu.menus_url = menu.scheduled_url
-
-                    # Clear scheduled fields and mark as applied
-                    menu.scheduled_text = None
-                    menu.scheduled_url = None
-                    menu.scheduled_at = None
-                    menu.applied = True
+            # Apply due versions (naive BST, like the DB) one claimed batch at
+            # a time; other workers skip the menus a batch has locked
+            now = bst_now()
+            applied = 0
+            while True:
+                claimed, menus = apply_due(now, limit=SCHEDULER_BATCH_SIZE)
+                if not claimed:
+                    db.session.rollback()
+                    break
 
+                db.session.commit()
+                content_cache.bump()
+                applied += len(claimed)
+                for menu_id, menu in menus.items():
                     logger.info(
-                        "Applied scheduled update for menu %s (%s)", menu.id, menu.menus_type
-                    )
-
-                except SQLAlchemyError as e:
-                    logger.error(
-                        "Error applying scheduled update for menu %s: %s", menu.id, str(e)
+                        "Applied scheduled update for menu %s (%s)",
+                        menu_id,
+                        menu["menus_type"],
                     )
-                    continue
+                if len(claimed) < SCHEDULER_BATCH_SIZE:
+                    break
 
-            # Commit all changes
-            db.session.commit()
-            logger.info("All scheduled updates applied successfully")
+            if not applied:
+                logger.info("No scheduled updates to apply")
+                return
+            logger.info("Applied %s scheduled updates", applied)
 
         except Exception as e:
             db.session.rollback()
@@ -20,3 +20,70 @@ if not SECRET:
 
 if db_URI and db_URI.startswith("postgres://"):
     db_URI = db_URI.replace("postgres://", "postgresql://", 1)
+
+# Where cached payloads and their version counters live. "memory://" is a
+# per-process LRU; a redis:// URL shares them between every worker and the
+# scheduler, so one write invalidates the cache everywhere.
+CACHE_URL = os.getenv("CACHE_URL", "memory://")
+
+# Seconds a cached payload may be served before it is rebuilt, even if no write
+# bumped its version (with "memory://", writes made by other processes).
+CONTENT_CACHE_TTL = int(os.getenv("CONTENT_CACHE_TTL", "60"))
+
+# Directory the public JSON is published into after every content change, for
+# serving from a CDN or static host. Publishing is disabled when unset.
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR")
+SNAPSHOT_KEEP = int(os.getenv("SNAPSHOT_KEEP", "5"))
+
+# Seconds a worker may reuse an authenticated user's id/role before reloading
+# it. Changes made through another worker reach this one within that window.
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+
+# Opt-in stateless authentication: trust the role and token version carried in
+# the JWT and check them against an in-memory revocation set instead of loading
+# the user. Each worker re-reads the (small) revocation table this often.
+AUTH_STATELESS = os.getenv("AUTH_STATELESS", "").lower() in ("1", "true", "yes")
+REVOCATION_SYNC_SECONDS = int(os.getenv("REVOCATION_SYNC_SECONDS", "10"))
+
+# bcrypt cost for new password hashes: a number, or "auto" to pick the highest
+# cost hashing within BCRYPT_TARGET_MS on this machine at startup. Hashing runs
+# on BCRYPT_WORKERS threads; beyond BCRYPT_MAX_PENDING queued checks, requests
+# are turned away with 503 instead of piling up.
+BCRYPT_LOG_ROUNDS = os.getenv("BCRYPT_LOG_ROUNDS", "12")
+BCRYPT_TARGET_MS = int(os.getenv("BCRYPT_TARGET_MS", "250"))
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", "2"))
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", "16"))
+
+# Look up a taken username/email (one combined query) before hashing on signup,
+# so both conflicts are reported at once. Without it the unique constraints
+# alone catch duplicates, saving a round trip.
+SIGNUP_PRECHECK = os.getenv("SIGNUP_PRECHECK", "").lower() in ("1", "true", "yes")
+
+# Outgoing mail is queued in mail_outbox and sent by mail_sender.py, which takes
+# up to MAIL_BATCH_SIZE due messages per SMTP connection and polls every
+# MAIL_POLL_SECONDS when idle. A failed message is retried after
+# MAIL_RETRY_BASE_SECONDS, doubling each time, and given up on after
+# MAIL_MAX_ATTEMPTS.
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", "50"))
+MAIL_POLL_SECONDS = float(os.getenv("MAIL_POLL_SECONDS", "5"))
+MAIL_RETRY_BASE_SECONDS = int(os.getenv("MAIL_RETRY_BASE_SECONDS", "30"))
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", "8"))
+
+# Local stand-in for Postgres LISTEN/NOTIFY: the UDP port on 127.0.0.1 the
+# menu scheduler listens on for newly scheduled updates. The scheduler also
+# re-reads the pending schedule from the database every
+# SCHEDULER_RESYNC_SECONDS in case a wakeup was lost.
+SCHEDULER_WAKE_PORT = int(os.getenv("SCHEDULER_WAKE_PORT", "8765"))
+SCHEDULER_RESYNC_SECONDS = int(os.getenv("SCHEDULER_RESYNC_SECONDS", "600"))
+
+# Applied menu versions due more than SCHEDULE_ARCHIVE_AFTER_DAYS ago are moved
+# to menu_schedule_archive, SCHEDULE_ARCHIVE_BATCH rows per transaction.
+SCHEDULE_ARCHIVE_AFTER_DAYS = int(os.getenv("SCHEDULE_ARCHIVE_AFTER_DAYS", "7"))
+SCHEDULE_ARCHIVE_BATCH = int(os.getenv("SCHEDULE_ARCHIVE_BATCH", "1000"))
+
+# Menus each scheduler worker applies due versions to per transaction. Workers
+# skip menus another worker has locked, so several can run side by side.
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", "500"))
+# Seconds a scheduler worker waits before retrying due menu versions it could
+# not claim because another worker held their menus, or after a failed pass.
+SCHEDULER_RETRY_SECONDS = int(os.getenv("SCHEDULER_RETRY_SECONDS", "5"))
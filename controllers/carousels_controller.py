@@ -2,33 +2,60 @@ from http import HTTPStatus
 from flask import Blueprint, request, jsonify
 from marshmallow import ValidationError
 from application import db
-from models import CarouselModel
+from models import CarouselModel, ContentModel
 from serializers.carousel_serializer import CarouselSerializer
+from lib.bulk import (
+    bulk_delete,
+    bulk_insert,
+    bulk_update,
+    missing_ids,
+    parse_ids,
+)
+from lib.cache import content_cache
+from lib.conditional import conditional_get
+from lib.fieldsets import FieldsetError, parse_fields
 from sqlalchemy.exc import SQLAlchemyError
 
-
 carousels_serializer = CarouselSerializer(session=db.session)
+carousels_batch_serializer = CarouselSerializer(load_instance=False)
 router = Blueprint("carousels", __name__)
 
+# Fields exposed by the public carousel listing.
+CAROUSEL_FIELDS = ("id", "carousel_url", "content_id")
+
 
 # --- Display Carousel section ---
 @router.route("/content/<int:content_id>/carousel", methods=["GET"])
+@conditional_get(
+    lambda content_id: [
+        (ContentModel, ContentModel.id == content_id),
+        (CarouselModel, CarouselModel.content_id == content_id),
+    ]
+)
 def get_carousels(content_id):
-    carousels = db.session.query(CarouselModel).filter_by(content_id=content_id).all()
-    if not carousels:
+    try:
+        fieldset = parse_fields(request.args.get("fields"), CAROUSEL_FIELDS)
+    except FieldsetError as e:
+        return (
+            jsonify({"message": "Invalid fields", "error": str(e)}),
+            HTTPStatus.BAD_REQUEST,
+        )
+
+    data = load_carousels(content_id, fieldset and fieldset[0])
+    if not data:
         return jsonify({"message": "No carousels found"}), HTTPStatus.NOT_FOUND
 
-    data = [
-        {
-            "id": c.id,
-            "carousel_url": c.carousel_url,
-            "content_id": c.content_id,
-        }
-        for c in carousels
-    ]
     return jsonify(data), HTTPStatus.OK
 
 
+def load_carousels(content_id, fields=None):
+    columns = [getattr(CarouselModel, name) for name in fields or CAROUSEL_FIELDS]
+    carousels = (
+        db.session.query(*columns).filter(CarouselModel.content_id == content_id).all()
+    )
+    return [c._asdict() for c in carousels]
+
+
 # --- Delete Carousel section ---
 @router.route(
     "/content/<int:content_id>/carousel/<int:carousel_id>", methods=["DELETE"]
@@ -39,9 +66,55 @@ def delete_carousel(content_id, carousel_id):
         return jsonify({"message": "Carousel not found"}, HTTPStatus.NOT_FOUND)
 
     carousel.remove()
+    content_cache.bump()
     return jsonify({"error": "Carousel deleted"})
 
 
+# --- Bulk Delete Carousel section ---
+@router.route("/content/<int:content_id>/carousel", methods=["DELETE"])
+def delete_carousels(content_id):
+    """Delete every carousel listed in ``?ids=`` in one statement."""
+    try:
+        ids = parse_ids(request.args.get("ids"))
+    except ValueError as e:
+        return (
+            jsonify({"message": "Invalid ids", "error": str(e)}),
+            HTTPStatus.BAD_REQUEST,
+        )
+
+    try:
+        deleted = bulk_delete(
+            CarouselModel, ids, CarouselModel.content_id == content_id
+        )
+        errors = missing_ids(ids, deleted, "Carousel")
+        if not deleted:
+            db.session.rollback()
+            return (
+                jsonify({"message": "No carousels were deleted", "errors": errors}),
+                HTTPStatus.NOT_FOUND,
+            )
+
+        db.session.commit()
+        content_cache.bump()
+        return (
+            jsonify(
+                {
+                    "message": f"{len(deleted)} carousels deleted",
+                    "deleted": sorted(deleted),
+                    "errors": errors,
+                }
+            ),
+            HTTPStatus.OK,
+        )
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return (
+            jsonify({"message": "Database error", "error": str(e)}),
+            HTTPStatus.INTERNAL_SERVER_ERROR,
+        )
+
+
 # --- Create Carousel section ---
 @router.route("/content/<int:content_id>/carousel", methods=["POST"])
 def create_carousel(content_id):
@@ -53,6 +126,7 @@ def create_carousel(content_id):
         )
         db.session.add(carousel_model)
         db.session.commit()
+        content_cache.bump()
         return jsonify(carousels_serializer.dump(carousel_model)), HTTPStatus.CREATED
 
     except ValidationError as e:
@@ -68,6 +142,47 @@ def create_carousel(content_id):
         )
 
 
+# --- Batch Create Carousels section ---
+@router.route("/content/<int:content_id>/carousel/batch", methods=["POST"])
+def create_carousel_batch(content_id):
+    """Create many carousels for a specific content ID, all or none."""
+    try:
+        items = request.get_json(silent=True)
+        if not isinstance(items, list) or not items:
+            return (
+                jsonify(
+                    {
+                        "error": "Invalid data format",
+                        "details": "Expected a non-empty array of carousels",
+                    }
+                ),
+                HTTPStatus.BAD_REQUEST,
+            )
+
+        for item in items:
+            if isinstance(item, dict):
+                item["content_id"] = content_id
+
+        created = bulk_insert(CarouselModel, carousels_batch_serializer, items)
+        # Dump before committing so expired rows aren't reloaded one by one.
+        data = carousels_serializer.dump(created, many=True)
+        db.session.commit()
+        content_cache.bump()
+        return jsonify(data), HTTPStatus.CREATED
+
+    except ValidationError as e:
+        return (
+            jsonify({"error": "Validation error", "details": e.messages}),
+            HTTPStatus.BAD_REQUEST,
+        )
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return (
+            jsonify({"error": "Database error", "details": str(e)}),
+            HTTPStatus.INTERNAL_SERVER_ERROR,
+        )
+
+
 # --- Update Carousel section ---
 @router.route("/content/<int:content_id>/carousel", methods=["PUT"])
 def update_carousel(content_id):
@@ -106,7 +221,8 @@ def update_carousel(content_id):
                 HTTPStatus.BAD_REQUEST,
             )
 
-        updated_carousels = []
+        requested = []
+        changes = {}
         for index, carousel_data in enumerate(data):
             # Validate each carousel object
             if not isinstance(carousel_data, dict):
@@ -162,34 +278,37 @@ def update_carousel(content_id):
                     HTTPStatus.BAD_REQUEST,
                 )
 
-            # Update carousel if it exists
-            carousel = CarouselModel.query.filter_by(
-                id=carousel_id, content_id=content_id
-            ).first()
+            requested.append(carousel_id)
+            changes[carousel_id] = {"carousel_url": carousel_url}
 
-            if carousel:
-                carousel.carousel_url = carousel_url
-                updated_carousels.append(
-                    {"id": carousel.id, "carousel_url": carousel.carousel_url}
-                )
+        # Apply the whole batch at once; ids that matched nothing are reported.
+        written = bulk_update(
+            CarouselModel, changes, CarouselModel.content_id == content_id
+        )
+        updated_carousels = [written[key] for key in changes if key in written]
+        errors = missing_ids(requested, written, "Carousel")
 
         if not updated_carousels:
+            db.session.rollback()
             return (
                 jsonify(
                     {
                         "message": "No carousels were updated",
                         "error": "No matching carousels found for the given IDs and content_id",
+                        "errors": errors,
                     }
                 ),
                 HTTPStatus.NOT_FOUND,
             )
 
         db.session.commit()
+        content_cache.bump()
         return (
             jsonify(
                 {
                     "message": "Carousels updated successfully",
                     "updated_carousels": updated_carousels,
+                    "errors": errors,
                 }
             ),
             HTTPStatus.OK,
@@ -231,6 +350,7 @@ def update_single_carousel(content_id, carousel_id):
 
         carousel.carousel_url = data["carousel_url"]
         db.session.commit()
+        content_cache.bump()
 
         return (
             jsonify(
@@ -2,30 +2,103 @@ from http import HTTPStatus
 from flask import Blueprint, request, jsonify
 from marshmallow.exceptions import ValidationError
 from application import db
-from models import ContentModel
+from models import ContentModel, CONTENT_SECTIONS, CarouselModel, MenusModel, GridModel
 from serializers.content_serializer import ContentSerializer
+from lib.bulk import bulk_update, collect_rows, missing_ids
+from lib.cache import content_cache, cached_json_response
+from lib.conditional import conditional_get
+from lib.fieldsets import FieldsetError, column_names, marshmallow_only, parse_fields
+from lib.merge_patch import MergePatchError, parse_merge_patch
+from controllers.menus_controller import load_menus
+from controllers.carousels_controller import load_carousels
+from controllers.grid_controller import load_grid
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import update
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import load_only, selectinload
 
 content_serializer = ContentSerializer()
 router = Blueprint("content", __name__)
 
+# Text columns a merge patch on /content/<id> may set.
+PATCHABLE_FIELDS = frozenset(column_names(ContentModel)) - {"id", "updated_at"}
+
+# Child collections accepted by the page save endpoint:
+# (key, model, label, required fields, optional fields).
+SAVE_COLLECTIONS = (
+    ("menus", MenusModel, "Menu", (), ("menus_text", "menus_url")),
+    ("carousel", CarouselModel, "Carousel", ("carousel_url",), ()),
+    ("grid", GridModel, "Grid", ("grid_url",), ()),
+)
+
 
 # --- Display Content section ---
 @router.route("/content", methods=["GET"])
 def get_content():
-    content = ContentModel.query.all()  # Fetch all content
-    serialized_content = ContentSerializer().dump(
+    try:
+        fieldset = parse_fields(
+            request.args.get("fields"),
+            column_names(ContentModel),
+            {
+                "carousels": column_names(CarouselModel),
+                "menus": column_names(MenusModel),
+                "grid": column_names(GridModel),
+            },
+        )
+    except FieldsetError as e:
+        return (
+            jsonify({"message": "Invalid fields", "error": str(e)}),
+            HTTPStatus.BAD_REQUEST,
+        )
+
+    sources = [(ContentModel,), (CarouselModel,), (MenusModel,), (GridModel,)]
+    if fieldset is None:
+        return cached_json_response("content", load_content, sources)
+    return cached_json_response(
+        ("content", marshmallow_only(*fieldset)),
+        lambda: load_content(fieldset),
+        sources,
+    )
+
+
+def load_content(fieldset=None):
+    if fieldset is None:
+        content = ContentModel.query.options(
+            *ContentModel.load_children("selectin")
+        ).all()
+        # Correct place for 'many=True'
+        return ContentSerializer().dump(content, many=True)
+
+    # Only select the requested columns, and only load requested children.
+    fields, nested = fieldset
+    options = [
+        load_only(ContentModel.id, *[getattr(ContentModel, name) for name in fields])
+    ]
+    for relation, child_fields in nested.items():
+        attribute = getattr(ContentModel, relation)
+        loader = selectinload(attribute)
+        if child_fields:
+            child_model = attribute.property.mapper.class_
+            loader = loader.load_only(
+                *[getattr(child_model, name) for name in child_fields]
+            )
+        options.append(loader)
+
+    content = ContentModel.query.options(*options).all()
+    return ContentSerializer(only=marshmallow_only(fields, nested)).dump(
         content, many=True
-    )  # Correct place for 'many=True'
-    return jsonify(serialized_content)  # Return the serialized data
+    )
 
 
 # --- Update Content section ---
 @router.route("/content/<int:content_id>", methods=["PUT"])
 def update_content(content_id):
     try:
-        content = db.session.query(ContentModel).get(content_id)
+        content = (
+            db.session.query(ContentModel)
+            .options(*ContentModel.load_children("selectin"))
+            .get(content_id)
+        )
         if content is None:
             return jsonify({"message": "Content not found"}), HTTPStatus.NOT_FOUND
 
@@ -100,6 +173,7 @@ def update_content(content_id):
                     break
 
         db.session.commit()
+        content_cache.bump()
         return content_serializer.jsonify(content)
 
     except Exception as e:
@@ -107,20 +181,206 @@ def update_content(content_id):
         return jsonify({"message": "Something went very wrong"}), HTTPStatus.BAD_REQUEST
 
 
+# --- Section helpers ---
+def load_section(content_id, section):
+    """Fetch only the columns declared for ``section``, without any joins."""
+    row = (
+        db.session.query(*ContentModel.section_columns(section))
+        .filter(ContentModel.id == content_id)
+        .first()
+    )
+    return None if row is None else row._asdict()
+
+
+def update_section(content_id, section, data):
+    """Apply the section's fields present in ``data`` and commit."""
+    patch = {field: data[field] for field in CONTENT_SECTIONS[section] if field in data}
+    result = apply_content_patch(content_id, patch, CONTENT_SECTIONS[section])
+    if result is None:
+        return None
+
+    if result[1]:
+        db.session.commit()
+        content_cache.bump()
+    return (
+        db.session.query(ContentModel)
+        .options(*ContentModel.load_children("selectin"))
+        .get(content_id)
+    )
+
+
+def apply_content_patch(content_id, patch, columns=()):
+    """Write the members of ``patch`` that differ from the stored row.
+
+    Reads the patched ``columns`` (plus any extra ``columns`` the caller wants
+    back), then issues a single UPDATE ... RETURNING of the changed ones; an
+    unchanged patch writes nothing. Returns ``(row, changed)`` with ``row``
+    the columns after the patch, or None when the content does not exist.
+    The caller commits.
+    """
+    names = list(dict.fromkeys([*columns, *patch]))
+    current = (
+        db.session.query(ContentModel.id, *[getattr(ContentModel, n) for n in names])
+        .filter(ContentModel.id == content_id)
+        .first()
+    )
+    if current is None:
+        return None
+
+    row = {name: getattr(current, name) for name in names}
+    changed = {name: value for name, value in patch.items() if row[name] != value}
+    if changed:
+        written = db.session.execute(
+            update(ContentModel)
+            .where(ContentModel.id == content_id)
+            .values(changed)
+            .returning(*[getattr(ContentModel, name) for name in changed])
+        ).one()
+        row.update(written._asdict())
+    return row, changed
+
+
+def merge_patch_response(content_id, fields, columns=()):
+    """Apply the request's merge patch and answer with the patched columns."""
+    if not request.is_json:
+        return (
+            jsonify({"message": "Expected application/merge-patch+json"}),
+            HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+        )
+    body = request.get_json(silent=True)
+    if body is None:
+        return (
+            jsonify(
+                {"message": "Invalid JSON format", "error": "Body is not valid JSON"}
+            ),
+            HTTPStatus.BAD_REQUEST,
+        )
+    try:
+        patch = parse_merge_patch(body, fields)
+    except MergePatchError as e:
+        return (
+            jsonify({"message": "Invalid patch", "error": str(e)}),
+            HTTPStatus.BAD_REQUEST,
+        )
+
+    result = apply_content_patch(content_id, patch, columns)
+    if result is None:
+        return jsonify({"message": "Content not found"}), HTTPStatus.NOT_FOUND
+
+    row, changed = result
+    if changed:
+        db.session.commit()
+        content_cache.bump()
+    return jsonify(row), HTTPStatus.OK
+
+
+# --- Patch Content section ---
+@router.route("/content/<int:content_id>", methods=["PATCH"])
+def patch_content(content_id):
+    try:
+        return merge_patch_response(content_id, PATCHABLE_FIELDS)
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        print("Error patching content:", str(e))
+        return jsonify({"message": "Something went very wrong"}), HTTPStatus.BAD_REQUEST
+
+
+# --- Patch a single section ---
+@router.route(
+    f"/content/<int:content_id>/<any({', '.join(CONTENT_SECTIONS)}):section>",
+    methods=["PATCH"],
+)
+def patch_section(content_id, section):
+    try:
+        fields = CONTENT_SECTIONS[section]
+        return merge_patch_response(content_id, fields, fields)
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        print(f"Error patching {section} section:", str(e))
+        return jsonify({"message": "Something went very wrong"}), HTTPStatus.BAD_REQUEST
+
+
+# --- Save whole page section ---
+@router.route("/content/<int:content_id>/save", methods=["PUT"])
+def save_page(content_id):
+    """Apply the editor's content, menus, carousel and grid changes at once.
+
+    Everything is written in one transaction with set-based statements and
+    the content version is bumped once; any error leaves nothing saved.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return (
+            jsonify({"message": "Expected a JSON object of changes"}),
+            HTTPStatus.BAD_REQUEST,
+        )
+
+    errors = {}
+    unknown = set(data) - {"content", *[key for key, *_ in SAVE_COLLECTIONS]}
+    if unknown:
+        errors["request"] = f"Unknown keys: {', '.join(sorted(unknown))}"
+    try:
+        patch = parse_merge_patch(data.get("content", {}), PATCHABLE_FIELDS)
+    except MergePatchError as e:
+        errors["content"] = str(e)
+
+    changes = {}
+    for key, _, _, required, optional in SAVE_COLLECTIONS:
+        changes[key], item_errors = collect_rows(data.get(key, []), required, optional)
+        if item_errors:
+            errors[key] = item_errors
+    if errors:
+        return (
+            jsonify({"message": "Invalid changes", "errors": errors}),
+            HTTPStatus.BAD_REQUEST,
+        )
+
+    try:
+        result = apply_content_patch(content_id, patch)
+        if result is None:
+            db.session.rollback()
+            return jsonify({"message": "Content not found"}), HTTPStatus.NOT_FOUND
+
+        summary = {"content": sorted(result[1])}
+        for key, model, label, _, _ in SAVE_COLLECTIONS:
+            written = bulk_update(model, changes[key], model.content_id == content_id)
+            missing = missing_ids(list(changes[key]), written, label)
+            if missing:
+                errors[key] = missing
+            summary[key] = len(written)
+
+        if errors:
+            db.session.rollback()
+            return (
+                jsonify({"message": "Nothing was saved", "errors": errors}),
+                HTTPStatus.NOT_FOUND,
+            )
+
+        if any(summary.values()):
+            db.session.commit()
+            content_cache.bump()
+        else:
+            db.session.rollback()
+        return jsonify({"message": "Page saved", "updated": summary}), HTTPStatus.OK
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        print("Error saving page:", str(e))
+        return jsonify({"message": "Something went very wrong"}), HTTPStatus.BAD_REQUEST
+
+
 # --- Display About section ---
 @router.route("/content/<int:content_id>/about", methods=["GET"])
+@conditional_get(lambda content_id: [(ContentModel, ContentModel.id == content_id)])
 def get_about_section(content_id):
     try:
-        content = db.session.query(ContentModel).get(content_id)
-        if content is None:
+        section_data = load_section(content_id, "about")
+        if section_data is None:
             return jsonify({"message": "Content not found"}), HTTPStatus.NOT_FOUND
 
-        about_data = {
-            "about_title": content.about_title,
-            "about_text": content.about_text,
-        }
-
-        return jsonify(about_data), HTTPStatus.OK
+        return jsonify(section_data), HTTPStatus.OK
 
     except Exception as e:
         print("Error fetching about section:", str(e))
@@ -130,22 +390,11 @@ def get_about_section(content_id):
 # --- Update About section ---
 @router.route("/content/<int:content_id>/about", methods=["PUT"])
 def update_about(content_id):
-
     try:
-        content = db.session.query(ContentModel).get(content_id)
+        content = update_section(content_id, "about", request.json)
         if content is None:
             return jsonify({"message": "Content not found"}), HTTPStatus.NOT_FOUND
 
-        data = request.json
-
-        # Only update the about section
-        if "about_title" in data:
-            content.about_title = data["about_title"]
-
-        if "about_text" in data:
-            content.about_text = data["about_text"]
-
-        db.session.commit()
         return content_serializer.jsonify(content)
 
     except Exception as e:
@@ -155,34 +404,14 @@ def update_about(content_id):
 
 # --- Display Reservation section ---
 @router.route("/content/<int:content_id>/reservation", methods=["GET"])
+@conditional_get(lambda content_id: [(ContentModel, ContentModel.id == content_id)])
 def get_reservation_section(content_id):
     try:
-        content = db.session.query(ContentModel).get(content_id)
-        if content is None:
+        section_data = load_section(content_id, "reservation")
+        if section_data is None:
             return jsonify({"message": "Content not found"}), HTTPStatus.NOT_FOUND
 
-        reservation_data = {
-            "reservation_title": content.reservation_title,
-            "reservation_text": content.reservation_text,
-            "reservation_line_one": content.reservation_line_one,
-            "reservation_line_two": content.reservation_line_two,
-            "breakfast_timing_day_one": content.breakfast_timing_day_one,
-            "breakfast_timing_hours_one": content.breakfast_timing_hours_one,
-            "breakfast_timing_day_two": content.breakfast_timing_day_two,
-            "breakfast_timing_hours_two": content.breakfast_timing_hours_two,
-            "lunch_timing_day_one": content.lunch_timing_day_one,
-            "lunch_timing_hours_one": content.lunch_timing_hours_one,
-            "lunch_timing_day_two": content.lunch_timing_day_two,
-            "lunch_timing_hours_two": content.lunch_timing_hours_two,
-            "dinner_timing_day_one": content.dinner_timing_day_one,
-            "dinner_timing_hours_one": content.dinner_timing_hours_one,
-            "dinner_timing_day_two": content.dinner_timing_day_two,
-            "dinner_timing_hours_two": content.dinner_timing_hours_two,
-            "phone": content.phone,
-            "email": content.email,
-        }
-
-        return jsonify(reservation_data), HTTPStatus.OK
+        return jsonify(section_data), HTTPStatus.OK
 
     except Exception as e:
         print("Error fetching reservation section:", str(e))
@@ -193,74 +422,10 @@ def get_reservation_section(content_id):
 @router.route("/content/<int:content_id>/reservation", methods=["PUT"])
 def update_reservation(content_id):
     try:
-        content = db.session.query(ContentModel).get(content_id)
+        content = update_section(content_id, "reservation", request.json)
         if content is None:
             return jsonify({"message": "Content not found"}), HTTPStatus.NOT_FOUND
 
-        data = request.json
-
-        # Only update the reservation section
-        if "reservation_title" in data:
-            content.reservation_title = data["reservation_title"]
-
-        if "reservation_text" in data:
-            content.reservation_text = data["reservation_text"]
-
-        if "reservation_line_one" in data:
-            content.reservation_line_one = data["reservation_line_one"]
-
-        if "reservation_line_two" in data:
-            content.reservation_line_two = data["reservation_line_two"]
-
-        if "phone" in data:
-            content.phone = data["phone"]
-
-        if "email" in data:
-            content.email = data["email"]
-
-        if "breakfast_timing_day_one" in data:
-            content.breakfast_timing_day_one = data["breakfast_timing_day_one"]
-
-        if "breakfast_timing_hours_one" in data:
-            content.breakfast_timing_hours_one = data["breakfast_timing_hours_one"]
-
-        if "breakfast_timing_day_two" in data:
-            content.breakfast_timing_day_two = data["breakfast_timing_day_two"]
-
-        if "breakfast_timing_hours_two" in data:
-            content.breakfast_timing_hours_two = data["breakfast_timing_hours_two"]
-
-        if "lunch_timing_day_one" in data:
-            content.lunch_timing_day_one = data["lunch_timing_day_one"]
-
-        if "lunch_timing_hours_one" in data:
-            content.lunch_timing_hours_one = data["lunch_timing_hours_one"]
-
-        if "lunch_timing_day_two" in data:
-            content.lunch_timing_day_two = data["lunch_timing_day_two"]
-
-        if "lunch_timing_hours_two" in data:
-            content.lunch_timing_hours_two = data["lunch_timing_hours_two"]
-
-        if "dinner_timing_day_one" in data:
-            content.dinner_timing_day_one = data["dinner_timing_day_one"]
-
-        if "dinner_timing_hours_one" in data:
-            content.dinner_timing_hours_one = data["dinner_timing_hours_one"]
-
-        if "dinner_timing_day_two" in data:
-            content.dinner_timing_day_two = data["dinner_timing_day_two"]
-
-        if "dinner_timing_hours_two" in data:
-            content.dinner_timing_hours_two = data["dinner_timing_hours_two"]
-
-        if "phone" in data:
-            content.phone = data["phone"]
-
-        if "email" in data:
-            content.email = data["email"]
-
-        db.session.commit()
         return content_serializer.jsonify(content)
 
     except Exception as e:
@@ -270,28 +435,14 @@ def update_reservation(content_id):
 
 # --- Display Contact section ---
 @router.route("/content/<int:content_id>/contact", methods=["GET"])
+@conditional_get(lambda content_id: [(ContentModel, ContentModel.id == content_id)])
 def get_contact_section(content_id):
     try:
-        content = db.session.query(ContentModel).get(content_id)
-        if content is None:
+        section_data = load_section(content_id, "contact")
+        if section_data is None:
             return jsonify({"message": "Content not found"}), HTTPStatus.NOT_FOUND
 
-        contact_data = {
-            "contact_title": content.contact_title,
-            "phone": content.phone,
-            "email": content.email,
-            "contact_adress_one": content.contact_adress_one,
-            "contact_adress_two": content.contact_adress_two,
-            "contact_opening_day_one": content.contact_opening_day_one,
-            "contact_opening_hours_one": content.contact_opening_hours_one,
-            "contact_opening_day_two": content.contact_opening_day_two,
-            "contact_opening_hours_two": content.contact_opening_hours_two,
-            "contact_opening_day_three": content.contact_opening_day_three,
-            "contact_opening_hours_three": content.contact_opening_hours_three,
-            "map": content.map,
-        }
-
-        return jsonify(contact_data), HTTPStatus.OK
+        return jsonify(section_data), HTTPStatus.OK
 
     except Exception as e:
         print("Error fetching contact section:", str(e))
@@ -302,50 +453,10 @@ def get_contact_section(content_id):
 @router.route("/content/<int:content_id>/contact", methods=["PUT"])
 def update_contact(content_id):
     try:
-        content = db.session.query(ContentModel).get(content_id)
+        content = update_section(content_id, "contact", request.json)
         if content is None:
             return jsonify({"message": "Content not found"}), HTTPStatus.NOT_FOUND
 
-        data = request.json
-
-        # Only update the contact section
-        if "contact_title" in data:
-            content.contact_title = data["contact_title"]
-
-        if "contact_adress_one" in data:
-            content.contact_adress_one = data["contact_adress_one"]
-
-        if "contact_adress_two" in data:
-            content.contact_adress_two = data["contact_adress_two"]
-
-        if "phone" in data:
-            content.phone = data["phone"]
-
-        if "email" in data:
-            content.email = data["email"]
-
-        if "contact_opening_day_one" in data:
-            content.contact_opening_day_one = data["contact_opening_day_one"]
-
-        if "contact_opening_hours_one" in data:
-            content.contact_opening_hours_one = data["contact_opening_hours_one"]
-
-        if "contact_opening_day_two" in data:
-            content.contact_opening_day_two = data["contact_opening_day_two"]
-
-        if "contact_opening_hours_two" in data:
-            content.contact_opening_hours_two = data["contact_opening_hours_two"]
-
-        if "contact_opening_day_three" in data:
-            content.contact_opening_day_three = data["contact_opening_day_three"]
-
-        if "contact_opening_hours_three" in data:
-            content.contact_opening_hours_three = data["contact_opening_hours_three"]
-
-        if "map" in data:
-            content.map = data["map"]
-
-        db.session.commit()
         return content_serializer.jsonify(content)
 
     except Exception as e:
@@ -355,20 +466,14 @@ def update_contact(content_id):
 
 # --- Display Opening Hours section ---
 @router.route("/content/<int:content_id>/opening_hours", methods=["GET"])
+@conditional_get(lambda content_id: [(ContentModel, ContentModel.id == content_id)])
 def get_opening_hours(content_id):
     try:
-        content = db.session.query(ContentModel).get(content_id)
-        if content is None:
+        section_data = load_section(content_id, "opening_hours")
+        if section_data is None:
             return jsonify({"message": "Content not found"}), HTTPStatus.NOT_FOUND
 
-        opening_hours_data = {
-            "breakfast_timing_day_one": content.breakfast_timing_day_one,
-            "breakfast_timing_hours_one": content.breakfast_timing_hours_one,
-            "breakfast_timing_day_two": content.breakfast_timing_day_two,
-            "breakfast_timing_hours_two": content.breakfast_timing_hours_two,
-        }
-
-        return jsonify(opening_hours_data), HTTPStatus.OK
+        return jsonify(section_data), HTTPStatus.OK
 
     except Exception as e:
         print("Error fetching opening hours:", str(e))
@@ -379,38 +484,76 @@ def get_opening_hours(content_id):
 @router.route("/content/<int:content_id>/opening_hours", methods=["PUT"])
 def update_opening_hours(content_id):
     try:
-        content = db.session.query(ContentModel).get(content_id)
+        content = update_section(content_id, "opening_hours", request.json)
         if content is None:
             return jsonify({"message": "Content not found"}), HTTPStatus.NOT_FOUND
 
-        data = request.json
-
-        # Only update the opening hours section
-        if "breakfast_timing_day_one" in data:
-            content.breakfast_timing_day_one = data["breakfast_timing_day_one"]
+        return content_serializer.jsonify(content)
 
-        if "breakfast_timing_hours_one" in data:
-            content.breakfast_timing_hours_one = data["breakfast_timing_hours_one"]
+    except Exception as e:
+        print("Error updating opening hours:", str(e))
+        return jsonify({"message": "Something went very wrong"}), HTTPStatus.BAD_REQUEST
 
-        if "breakfast_timing_day_two" in data:
-            content.breakfast_timing_day_two = data["breakfast_timing_day_two"]
 
-        if "breakfast_timing_hours_two" in data:
-            content.breakfast_timing_hours_two = data["breakfast_timing_hours_two"]
+# --- Display whole page bundle ---
+@router.route("/content/<int:content_id>/bundle", methods=["GET"])
+def get_bundle(content_id):
+    try:
+        response = cached_json_response(
+            ("bundle", content_id),
+            lambda: load_bundle(content_id),
+            [
+                (ContentModel, ContentModel.id == content_id),
+                (CarouselModel, CarouselModel.content_id == content_id),
+                (MenusModel, MenusModel.content_id == content_id),
+                (GridModel, GridModel.content_id == content_id),
+            ],
+        )
+        if response is None:
+            return jsonify({"message": "Content not found"}), HTTPStatus.NOT_FOUND
 
-        db.session.commit()
-        return content_serializer.jsonify(content)
+        return response
 
     except Exception as e:
-        print("Error updating opening hours:", str(e))
+        print("Error fetching bundle:", str(e))
         return jsonify({"message": "Something went very wrong"}), HTTPStatus.BAD_REQUEST
 
 
+def load_bundle(content_id):
+    """Every section of a page: one content query plus one per child table."""
+    columns = {}
+    for section in CONTENT_SECTIONS:
+        columns.update(
+            (column.key, column) for column in ContentModel.section_columns(section)
+        )
+    row = (
+        db.session.query(*columns.values())
+        .filter(ContentModel.id == content_id)
+        .first()
+    )
+    if row is None:
+        return None
+
+    content = row._asdict()
+    bundle = {
+        section: {name: content[name] for name in fields}
+        for section, fields in CONTENT_SECTIONS.items()
+    }
+    bundle["menus"] = load_menus(content_id)
+    bundle["carousel"] = load_carousels(content_id)
+    bundle["grid"] = load_grid(content_id)
+    return bundle
+
+
 @router.route("/content/<int:content_id>/update_grid", methods=["PUT"])
 def update_grid(content_id):
     try:
         # Get the content by ID
-        content = db.session.query(ContentModel).get(content_id)
+        content = (
+            db.session.query(ContentModel)
+            .options(*ContentModel.load_children("selectin"))
+            .get(content_id)
+        )
         if not content:
             return jsonify({"error": "Content not found"}), 404
 
@@ -442,6 +585,7 @@ def update_grid(content_id):
         # Save changes to database
         try:
             db.session.commit()
+            content_cache.bump()
             return (
                 jsonify(
                     {
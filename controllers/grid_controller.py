@@ -2,36 +2,65 @@ from http import HTTPStatus
 from flask import Blueprint, request, jsonify
 from marshmallow import ValidationError
 from application import db
+from models.content_model import ContentModel
 from models.grid_model import GridModel
 from serializers.grid_serializer import GridSerializer
+from lib.bulk import (
+    bulk_delete,
+    bulk_insert,
+    bulk_update,
+    missing_ids,
+    parse_ids,
+)
+from lib.cache import content_cache
+from lib.conditional import conditional_get
+from lib.fieldsets import FieldsetError, parse_fields
+from lib.grid_order import move_tile, next_positions
 from sqlalchemy.exc import SQLAlchemyError
 
-
 grid_serializer = GridSerializer(session=db.session)
+grid_batch_serializer = GridSerializer(load_instance=False)
 router = Blueprint("grid", __name__)
 
+# Fields exposed by the public grid listing.
+GRID_FIELDS = ("id", "position", "grid_url", "height", "width", "content_id")
+
 
 # --- Display Carousel section ---
 @router.route("/content/<int:content_id>/grid", methods=["GET"])
+@conditional_get(
+    lambda content_id: [
+        (ContentModel, ContentModel.id == content_id),
+        (GridModel, GridModel.content_id == content_id),
+    ]
+)
 def get_grid(content_id):
-    grid = db.session.query(GridModel).filter_by(content_id=content_id).all()
-    if not grid:
+    try:
+        fieldset = parse_fields(request.args.get("fields"), GRID_FIELDS)
+    except FieldsetError as e:
+        return (
+            jsonify({"message": "Invalid fields", "error": str(e)}),
+            HTTPStatus.BAD_REQUEST,
+        )
+
+    data = load_grid(content_id, fieldset and fieldset[0])
+    if not data:
         return jsonify({"message": "No grid found"}), HTTPStatus.NOT_FOUND
 
-    data = [
-        {
-            "id": c.id,
-            "position": c.position,
-            "grid_url": c.grid_url,
-            "height": c.height,
-            "width": c.width,
-            "content_id": c.content_id,
-        }
-        for c in grid
-    ]
     return jsonify(data), HTTPStatus.OK
 
 
+def load_grid(content_id, fields=None):
+    columns = [getattr(GridModel, name) for name in fields or GRID_FIELDS]
+    grid = (
+        db.session.query(*columns)
+        .filter(GridModel.content_id == content_id)
+        .order_by(GridModel.position, GridModel.id)
+        .all()
+    )
+    return [c._asdict() for c in grid]
+
+
 # --- Delete Carousel section ---
 @router.route("/content/<int:content_id>/grid/<int:grid_id>", methods=["DELETE"])
 def delete_grid(content_id, grid_id):
@@ -40,18 +69,66 @@ def delete_grid(content_id, grid_id):
         return jsonify({"message": "Grid not found"}, HTTPStatus.NOT_FOUND)
 
     grid.remove()
+    content_cache.bump()
     return jsonify({"error": "Grid deleted"})
 
 
+# --- Bulk Delete Grid section ---
+@router.route("/content/<int:content_id>/grid", methods=["DELETE"])
+def delete_grids(content_id):
+    """Delete every grid listed in ``?ids=`` in one statement."""
+    try:
+        ids = parse_ids(request.args.get("ids"))
+    except ValueError as e:
+        return (
+            jsonify({"message": "Invalid ids", "error": str(e)}),
+            HTTPStatus.BAD_REQUEST,
+        )
+
+    try:
+        deleted = bulk_delete(GridModel, ids, GridModel.content_id == content_id)
+        errors = missing_ids(ids, deleted, "Grid")
+        if not deleted:
+            db.session.rollback()
+            return (
+                jsonify({"message": "No grid tiles were deleted", "errors": errors}),
+                HTTPStatus.NOT_FOUND,
+            )
+
+        db.session.commit()
+        content_cache.bump()
+        return (
+            jsonify(
+                {
+                    "message": f"{len(deleted)} grid tiles deleted",
+                    "deleted": sorted(deleted),
+                    "errors": errors,
+                }
+            ),
+            HTTPStatus.OK,
+        )
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return (
+            jsonify({"message": "Database error", "error": str(e)}),
+            HTTPStatus.INTERNAL_SERVER_ERROR,
+        )
+
+
 # --- Create Carousel section ---
 @router.route("/content/<int:content_id>/grid", methods=["POST"])
 def create_grid(content_id):
     try:
         grid_dictionary = request.json
         grid_dictionary["content_id"] = content_id
+        # New tiles go last, leaving room to move others in between.
+        if grid_dictionary.get("position") is None:
+            (grid_dictionary["position"],) = next_positions(content_id)
         grid_model = grid_serializer.load(grid_dictionary, session=db.session)
         db.session.add(grid_model)
         db.session.commit()
+        content_cache.bump()
         return jsonify(grid_serializer.dump(grid_model)), HTTPStatus.CREATED
 
     except ValidationError as e:
@@ -67,6 +144,53 @@ def create_grid(content_id):
         )
 
 
+# --- Batch Create Grid section ---
+@router.route("/content/<int:content_id>/grid/batch", methods=["POST"])
+def create_grid_batch(content_id):
+    """Create many grid tiles for a specific content ID, all or none."""
+    try:
+        items = request.get_json(silent=True)
+        if not isinstance(items, list) or not items:
+            return (
+                jsonify(
+                    {
+                        "error": "Invalid data format",
+                        "details": "Expected a non-empty array of grid tiles",
+                    }
+                ),
+                HTTPStatus.BAD_REQUEST,
+            )
+
+        unplaced = []
+        for item in items:
+            if isinstance(item, dict):
+                item["content_id"] = content_id
+                if item.get("position") is None:
+                    unplaced.append(item)
+        # Tiles sent without a position are appended in order, spaced apart.
+        for item, position in zip(unplaced, next_positions(content_id, len(unplaced))):
+            item["position"] = position
+
+        created = bulk_insert(GridModel, grid_batch_serializer, items)
+        # Dump before committing so expired rows aren't reloaded one by one.
+        data = grid_serializer.dump(created, many=True)
+        db.session.commit()
+        content_cache.bump()
+        return jsonify(data), HTTPStatus.CREATED
+
+    except ValidationError as e:
+        return (
+            jsonify({"error": "Validation error", "details": e.messages}),
+            HTTPStatus.BAD_REQUEST,
+        )
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return (
+            jsonify({"error": "Database error", "details": str(e)}),
+            HTTPStatus.INTERNAL_SERVER_ERROR,
+        )
+
+
 # --- Update Carousel section ---
 @router.route("/content/<int:content_id>/grid", methods=["PUT"])
 def update_grid(content_id):
@@ -105,7 +229,8 @@ def update_grid(content_id):
                 HTTPStatus.BAD_REQUEST,
             )
 
-        updated_grids = []
+        requested = []
+        changes = {}
         for index, grid_data in enumerate(data):
             # Validate each grid object
             if not isinstance(grid_data, dict):
@@ -161,38 +286,40 @@ def update_grid(content_id):
                     HTTPStatus.BAD_REQUEST,
                 )
 
-            # Update carousel if it exists
-            grid = GridModel.query.filter_by(id=grid_id, content_id=content_id).first()
+            requested.append(grid_id)
+            changes[grid_id] = {"grid_url": grid_url}
 
-            if grid:
-                grid.grid_url = grid_url
-                updated_grids.append(
-                    {
-                        "id": grid.id,
-                        "grid_url": grid.grid_url,
-                        "position": grid.position,
-                        "height": grid.height,
-                        "width": grid.width,
-                    }
-                )
+        # Apply the whole batch at once; ids that matched nothing are reported.
+        written = bulk_update(
+            GridModel,
+            changes,
+            GridModel.content_id == content_id,
+            returning=(GridModel.position, GridModel.height, GridModel.width),
+        )
+        updated_grids = [written[key] for key in changes if key in written]
+        errors = missing_ids(requested, written, "Grid")
 
         if not updated_grids:
+            db.session.rollback()
             return (
                 jsonify(
                     {
                         "message": "No grids were updated",
                         "error": "No matching grids found for the given IDs and content_id",
+                        "errors": errors,
                     }
                 ),
                 HTTPStatus.NOT_FOUND,
             )
 
         db.session.commit()
+        content_cache.bump()
         return (
             jsonify(
                 {
                     "message": "Grids updated successfully",
                     "updated_grids": updated_grids,
+                    "errors": errors,
                 }
             ),
             HTTPStatus.OK,
@@ -232,6 +359,7 @@ def update_single_grid(content_id, grid_id):
 
         grid.grid_url = data["grid_url"]
         db.session.commit()
+        content_cache.bump()
 
         return (
             jsonify(
@@ -255,3 +383,47 @@ def update_single_grid(content_id, grid_id):
             jsonify({"message": "Something went wrong", "error": str(e)}),
             HTTPStatus.INTERNAL_SERVER_ERROR,
         )
+
+
+# --- Move Grid tile section ---
+@router.route("/content/<int:content_id>/grid/<int:grid_id>/move", methods=["PUT"])
+def move_grid(content_id, grid_id):
+    """Move a tile right after ``after_id``, or to the front when it is null."""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return (
+                jsonify({"message": "Invalid data format. 'after_id' is required"}),
+                HTTPStatus.BAD_REQUEST,
+            )
+
+        after_id = data.get("after_id")
+        if after_id is not None and not isinstance(after_id, int):
+            return (
+                jsonify({"message": "'after_id' must be a grid id or null"}),
+                HTTPStatus.BAD_REQUEST,
+            )
+
+        position = move_tile(content_id, grid_id, after_id)
+        if position is None:
+            db.session.rollback()
+            return jsonify({"message": "Grid not found"}), HTTPStatus.NOT_FOUND
+
+        db.session.commit()
+        content_cache.bump()
+        return (
+            jsonify(
+                {
+                    "message": "Grid moved successfully",
+                    "grid": {"id": grid_id, "position": position},
+                }
+            ),
+            HTTPStatus.OK,
+        )
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return (
+            jsonify({"message": "Database error", "error": str(e)}),
+            HTTPStatus.INTERNAL_SERVER_ERROR,
+        )
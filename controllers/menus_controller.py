@@ -6,13 +6,24 @@ from datetime import datetime, timedelta, timezone
 from flask import Blueprint, request, jsonify
 from marshmallow.exceptions import ValidationError
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import load_only
 
 from application import db
-from models import MenusModel
+from models import ContentModel, MenusModel
 from serializers.menus_serializer import MenusSerializer
 from middleware.secure_route import role_required
+from lib.bulk import bulk_delete, bulk_insert, missing_ids, parse_ids
+from lib.cache import content_cache, cached_json_response
+from lib.fieldsets import FieldsetError, column_names, parse_fields
+from lib.menu_schedule import (
+    apply_due,
+    pending_versions,
+    schedule_version,
+)
+from models.menu_schedule_model import MenuScheduleModel
 
 menus_serializer = MenusSerializer()
+menus_batch_serializer = MenusSerializer(load_instance=False)
 router = Blueprint("menus", __name__)
 
 
@@ -21,11 +32,27 @@ router = Blueprint("menus", __name__)
 def get_menus(content_id):
     """Get all menus for a specific content ID."""
     try:
-        menus = db.session.query(MenusModel).filter_by(content_id=content_id).all()
-        if not menus:
+        fieldset = parse_fields(request.args.get("fields"), column_names(MenusModel))
+    except FieldsetError as _:
+        return (
+            jsonify({"message": "Invalid fields", "error": str(_)}),
+            HTTPStatus.BAD_REQUEST,
+        )
+
+    fields = tuple(fieldset[0]) if fieldset else None
+    try:
+        response = cached_json_response(
+            ("menus", content_id, fields),
+            lambda: load_menus(content_id, fields) or None,
+            [
+                (ContentModel, ContentModel.id == content_id),
+                (MenusModel, MenusModel.content_id == content_id),
+            ],
+        )
+        if response is None:
             return jsonify({"message": "No menus found"}), HTTPStatus.NOT_FOUND
 
-        return jsonify(menus_serializer.dump(menus, many=True)), HTTPStatus.OK
+        return response
 
     except ValidationError as _:
         return (
@@ -34,6 +61,18 @@ def get_menus(content_id):
         )
 
 
+def load_menus(content_id, fields=None):
+    """Serialized menus for a specific content ID, optionally only ``fields``."""
+    query = db.session.query(MenusModel).filter_by(content_id=content_id)
+    if not fields:
+        return menus_serializer.dump(query.all(), many=True)
+
+    menus = query.options(
+        load_only(*[getattr(MenusModel, name) for name in fields])
+    ).all()
+    return MenusSerializer(only=fields).dump(menus, many=True)
+
+
 # --- Create Menus section ---
 @router.route("/content/<int:content_id>/menus", methods=["POST"])
 @role_required("admin", "superadmin")
@@ -49,6 +88,7 @@ def create_menus(content_id):
         menus_model = menus_serializer.load(menus_dictionary, session=db.session)
         db.session.add(menus_model)
         db.session.commit()
+        content_cache.bump()
         return jsonify(menus_serializer.dump(menus_model)), HTTPStatus.CREATED
 
     except ValidationError as _:
@@ -64,6 +104,51 @@ def create_menus(content_id):
         )
 
 
+# --- Batch Create Menus section ---
+@router.route("/content/<int:content_id>/menus/batch", methods=["POST"])
+@role_required("admin", "superadmin")
+def create_menus_batch(content_id):
+    """Create many menus for a specific content ID, all or none."""
+    try:
+        items = request.get_json(silent=True)
+        if not isinstance(items, list) or not items:
+            return (
+                jsonify(
+                    {
+                        "error": "Invalid data format",
+                        "details": "Expected a non-empty array of menus",
+                    }
+                ),
+                HTTPStatus.BAD_REQUEST,
+            )
+
+        for item in items:
+            if isinstance(item, dict):
+                item["content_id"] = content_id
+                # Ensure menus_type is lowercase of menus_text
+                if isinstance(item.get("menus_text"), str):
+                    item["menus_type"] = item["menus_text"].lower()
+
+        created = bulk_insert(MenusModel, menus_batch_serializer, items)
+        # Dump before committing so expired rows aren't reloaded one by one.
+        data = menus_serializer.dump(created, many=True)
+        db.session.commit()
+        content_cache.bump()
+        return jsonify(data), HTTPStatus.CREATED
+
+    except ValidationError as _:
+        return (
+            jsonify({"error": "Validation error", "details": _.messages}),
+            HTTPStatus.BAD_REQUEST,
+        )
+    except SQLAlchemyError as _:
+        db.session.rollback()
+        return (
+            jsonify({"error": "Database error", "details": str(_)}),
+            HTTPStatus.INTERNAL_SERVER_ERROR,
+        )
+
+
 # --- Update Single Menu section ---
 @router.route("/content/<int:content_id>/menus/<string:menu_type>", methods=["PUT"])
 def update_single_menu(content_id, menu_type):
@@ -106,16 +191,19 @@ def update_single_menu(content_id, menu_type):
 
                 # Check if scheduled time is sufficiently in the future (both in BST)
                 if parsed_time_bst > min_future_time_bst:
-                    menu.scheduled_text = data.get("menus_text")
-                    menu.scheduled_url = data.get("menus_url")
-                    # Store as naive BST datetime
-                    menu.scheduled_at = parsed_time_bst
-                    menu.applied = False
+                    # Queued next to any other versions; due_at is naive BST
+                    version = schedule_version(
+                        menu,
+                        parsed_time_bst,
+                        menus_text=data.get("menus_text"),
+                        menus_url=data.get("menus_url"),
+                    )
                     db.session.commit()
                     return (
                         jsonify(
                             {
                                 "message": "Menu update scheduled",
+                                "schedule_id": version.id,
                                 "scheduled_for_bst": parsed_time_bst.isoformat(),
                                 "current_time_bst": now_bst.replace(
                                     tzinfo=None
@@ -162,13 +250,8 @@ def update_single_menu(content_id, menu_type):
         if "menus_url" in data:
             menu.menus_url = data["menus_url"]
 
-        # Clear any old scheduled data
-        menu.scheduled_text = None
-        menu.scheduled_url = None
-        menu.scheduled_at = None
-        menu.applied = True
-
         db.session.commit()
+        content_cache.bump()
         return jsonify({"message": "Menu updated immediately"}), HTTPStatus.OK
 
     except ValidationError as _:
@@ -192,6 +275,7 @@ def delete_menu(content_id, menu_type):
             return jsonify({"message": "Menu not found"}), HTTPStatus.NOT_FOUND
 
         menu.remove()
+        content_cache.bump()
         return (
             jsonify(
                 {"message": f"{menu.menus_text.capitalize()} menu deleted successfully"}
@@ -207,6 +291,50 @@ def delete_menu(content_id, menu_type):
         )
 
 
+# --- Bulk Delete Menu section ---
+@router.route("/content/<int:content_id>/menus", methods=["DELETE"])
+@role_required("admin", "superadmin")
+def delete_menus(content_id):
+    """Delete every menu listed in ``?ids=`` in one statement."""
+    try:
+        ids = parse_ids(request.args.get("ids"))
+    except ValueError as e:
+        return (
+            jsonify({"message": "Invalid ids", "error": str(e)}),
+            HTTPStatus.BAD_REQUEST,
+        )
+
+    try:
+        deleted = bulk_delete(MenusModel, ids, MenusModel.content_id == content_id)
+        errors = missing_ids(ids, deleted, "Menu")
+        if not deleted:
+            db.session.rollback()
+            return (
+                jsonify({"message": "No menus were deleted", "errors": errors}),
+                HTTPStatus.NOT_FOUND,
+            )
+
+        db.session.commit()
+        content_cache.bump()
+        return (
+            jsonify(
+                {
+                    "message": f"{len(deleted)} menus deleted",
+                    "deleted": sorted(deleted),
+                    "errors": errors,
+                }
+            ),
+            HTTPStatus.OK,
+        )
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return (
+            jsonify({"message": "Database error", "error": str(e)}),
+            HTTPStatus.INTERNAL_SERVER_ERROR,
+        )
+
+
 # --- Check Scheduled Updates ---
 @router.route("/content/<int:content_id>/menus/scheduled", methods=["GET"])
 def get_scheduled_updates(content_id):
@@ -216,29 +344,24 @@ def get_scheduled_updates(content_id):
         now_bst = now_utc.astimezone(timezone(timedelta(hours=1)))  # Convert UTC to BST
         now_bst_naive = now_bst.replace(tzinfo=None)  # Remove timezone for comparison
 
-        # Get all scheduled updates for this content
-        scheduled_menus = MenusModel.query.filter(
-            MenusModel.content_id == content_id,
-            MenusModel.scheduled_at.isnot(None),
-            MenusModel.applied.is_(False),
-        ).all()
-
+        # Get every queued version for this content, soonest first
         scheduled_updates = []
-        for menu in scheduled_menus:
+        for version, menu in pending_versions(content_id):
             # Database stores naive BST datetime
-            scheduled_bst = menu.scheduled_at
+            scheduled_bst = version.due_at
 
             scheduled_updates.append(
                 {
                     "id": menu.id,
+                    "schedule_id": version.id,
                     "menus_type": menu.menus_type,
                     "current_text": menu.menus_text,
                     "current_url": menu.menus_url,
-                    "scheduled_text": menu.scheduled_text,
-                    "scheduled_url": menu.scheduled_url,
+                    "scheduled_text": version.menus_text,
+                    "scheduled_url": version.menus_url,
                     "scheduled_at_bst": scheduled_bst.isoformat(),
                     "is_due": scheduled_bst <= now_bst_naive,
-                    "applied": menu.applied,
+                    "applied": version.applied,
                     "minutes_until_due": (
                         int((scheduled_bst - now_bst_naive).total_seconds() / 60)
                         if scheduled_bst > now_bst_naive
@@ -266,6 +389,42 @@ def get_scheduled_updates(content_id):
         )
 
 
+# --- Cancel Scheduled Update section ---
+@router.route(
+    "/content/<int:content_id>/menus/scheduled/<int:schedule_id>", methods=["DELETE"]
+)
+@role_required("admin", "superadmin")
+def cancel_scheduled_update(content_id, schedule_id):
+    """Drop one queued menu version before it is applied."""
+    try:
+        version = (
+            db.session.query(MenuScheduleModel)
+            .join(MenusModel, MenusModel.id == MenuScheduleModel.menu_id)
+            .filter(
+                MenuScheduleModel.id == schedule_id,
+                MenuScheduleModel.applied.is_(False),
+                MenusModel.content_id == content_id,
+            )
+            .first()
+        )
+        if not version:
+            return (
+                jsonify({"message": "Scheduled update not found"}),
+                HTTPStatus.NOT_FOUND,
+            )
+
+        db.session.delete(version)
+        db.session.commit()
+        return jsonify({"message": "Scheduled update cancelled"}), HTTPStatus.OK
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return (
+            jsonify({"message": "Database error", "error": str(e)}),
+            HTTPStatus.INTERNAL_SERVER_ERROR,
+        )
+
+
 # --- Manual trigger for scheduled updates (for testing) ---
 @router.route("/content/<int:content_id>/menus/apply-scheduled", methods=["POST"])
 def apply_scheduled_updates_manually(content_id):
@@ -275,15 +434,11 @@ def apply_scheduled_updates_manually(content_id):
         now_bst = now_utc.astimezone(timezone(timedelta(hours=1)))  # Convert UTC to BST
         now_bst_naive = now_bst.replace(tzinfo=None)  # Remove timezone for comparison
 
-        # Find scheduled updates that are due for this content (using BST)
-        scheduled_menus = MenusModel.query.filter(
-            MenusModel.content_id == content_id,
-            MenusModel.scheduled_at <= now_bst_naive,  # Database stores naive BST
-            MenusModel.applied.is_(False),
-            MenusModel.scheduled_at.isnot(None),
-        ).all()
+        # Apply the versions due for this content (using BST) in one claim
+        claimed, menus = apply_due(now_bst_naive, content_id)
 
-        if not scheduled_menus:
+        if not claimed:
+            db.session.rollback()
             return (
                 jsonify(
                     {
@@ -295,36 +450,23 @@ def apply_scheduled_updates_manually(content_id):
                 HTTPStatus.OK,
             )
 
-        applied_updates = []
-
-        for menu in scheduled_menus:
-            # Apply the scheduled changes
-            if menu.scheduled_text:
-                menu.menus_text = menu.scheduled_text
-            if menu.scheduled_url:
-                menu.menus_url = menu.scheduled_url
-
-            applied_updates.append(
-                {
-                    "id": menu.id,
-                    "menus_type": menu.menus_type,
-                    "new_text": menu.menus_text,
-                    "new_url": menu.menus_url,
-                }
-            )
-
-            # Clear scheduled fields and mark as applied
-            menu.scheduled_text = None
-            menu.scheduled_url = None
-            menu.scheduled_at = None
-            menu.applied = True
-
         db.session.commit()
+        content_cache.bump()
+
+        applied_updates = [
+            {
+                "id": menu_id,
+                "menus_type": menu["menus_type"],
+                "new_text": menu["menus_text"],
+                "new_url": menu["menus_url"],
+            }
+            for menu_id, menu in sorted(menus.items())
+        ]
 
         return (
             jsonify(
                 {
-                    "message": f"Successfully applied {len(applied_updates)} scheduled updates",
+                    "message": f"Successfully applied {len(claimed)} scheduled updates",
                     "applied_updates": applied_updates,
                 }
             ),
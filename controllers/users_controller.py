@@ -1,22 +1,40 @@
 """Users controller for managing user authentication, registration, and profile updates."""
 
 import re
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from http import HTTPStatus
 from smtplib import SMTPException
+from urllib.parse import urlencode
 import jwt
 from flask import Blueprint, request, jsonify, g
-from flask_mail import Message
 from marshmallow.exceptions import ValidationError
-from application import db, app, mail, limiter
-from config.environment import SECRET
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from application import db, app, limiter
+from config.environment import SECRET, SIGNUP_PRECHECK
 from middleware.secure_route import secure_route, role_required
+from lib.bulk import bulk_delete, missing_ids, parse_ids
+from lib.cache import cached_json_response, user_cache
+from lib.conditional import conditional_get
+from lib.outbox import enqueue
+from lib.principals import forget_principal
+from lib.revocations import REVOKE_ALL, TOKEN_LIFETIME, revocations
+from lib.streaming import render_rows, stream_rows, wants_ndjson
 from models.users_model import UserModel
-from serializers.users_serializer import UserSerializer
+from serializers.users_serializer import UserSerializer, password_problem
 
 user_serializer = UserSerializer()
 router = Blueprint("users", __name__)
 
+# Largest page of the keyset-paginated user listing.
+USERS_PAGE_MAX = 500
+
+# Signup errors for each uniquely constrained column.
+CONFLICT_ERRORS = {
+    "username": "The username already exist",
+    "email": "The email already exist",
+}
+
 
 # --- Signup section ---
 @router.route("/signup", methods=["POST"])
@@ -44,87 +62,42 @@ def signup():
                 jsonify({"error": "you need to enter an email"}),
                 HTTPStatus.BAD_REQUEST,
             )
-        email = (
-            db.session.query(UserModel)
-            .filter_by(email=user_dictionary["email"])
-            .first()
-        )
-        if email:
-            return jsonify({"error": "The email already exist"}), HTTPStatus.BAD_REQUEST
-
         username_to_enter = user_dictionary.get("username")
         if not username_to_enter:
             return (
                 jsonify({"error": "you need to enter a username"}),
                 HTTPStatus.BAD_REQUEST,
             )
-        username = (
-            db.session.query(UserModel)
-            .filter_by(username=user_dictionary["username"])
-            .first()
-        )
-        if username:
-            return (
-                jsonify({"error": "The username already exist"}),
-                HTTPStatus.BAD_REQUEST,
-            )
-        if username == "":
-            return (
-                jsonify({"error": "you need to enter an email"}),
-                HTTPStatus.BAD_REQUEST,
-            )
 
         password = user_dictionary.get("password")
         password_confirmation = user_dictionary.get("password_confirmation")
         if password != password_confirmation:
             return jsonify({"error": "Passwords do not match"}), HTTPStatus.BAD_REQUEST
-        spec_chart = ["!", "@", "#", "$", "%", "&", "*"]
-        if len(password) < 8:
-            return (
-                jsonify(
-                    {"error": "Password needs to be a minimum of 8 characters long"}
-                ),
-                HTTPStatus.BAD_REQUEST,
-            )
-        if len(password) > 20:
-            return (
-                jsonify(
-                    {"error": "Password needs to be a maximum of 20 characters long"}
-                ),
-                HTTPStatus.BAD_REQUEST,
-            )
-        if not re.search("[a-z]", password):
-            return (
-                jsonify(
-                    {"error": "Password needs to contain at least 1 lowercase letter"}
-                ),
-                HTTPStatus.BAD_REQUEST,
-            )
-        if not re.search("[A-Z]", password):
-            return (
-                jsonify(
-                    {"error": "Password needs to contain at least 1 uppercase letter"}
-                ),
-                HTTPStatus.BAD_REQUEST,
-            )
-        if not re.search("[0-9]", password):
-            return (
-                jsonify({"error": "Password needs to contain at least 1 digit"}),
-                HTTPStatus.BAD_REQUEST,
-            )
-        if not any(char in spec_chart for char in password):
-            return (
-                jsonify(
-                    {"error": "Password needs to contain at least 1 special character"}
-                ),
-                HTTPStatus.BAD_REQUEST,
-            )
-        else:
-            user_model = user_serializer.load(user_dictionary)
-            user_model.role = "user"
-            db.session.add(user_model)
+        problem = password_problem(password)
+        if problem:
+            return jsonify({"error": problem}), HTTPStatus.BAD_REQUEST
+
+        if SIGNUP_PRECHECK:
+            taken = taken_fields(username_to_enter, email_to_enter)
+            if taken:
+                return (
+                    jsonify({"error": " ".join(CONFLICT_ERRORS[f] for f in taken)}),
+                    HTTPStatus.BAD_REQUEST,
+                )
+
+        user_model = user_serializer.load(user_dictionary)
+        user_model.role = "user"
+        db.session.add(user_model)
+        try:
             db.session.commit()
-            return user_serializer.jsonify(user_model)
+        except IntegrityError as e:
+            # The unique constraints settle concurrent signups for the same name.
+            db.session.rollback()
+            field = conflicting_field(e)
+            if field is None:
+                raise
+            return jsonify({"error": CONFLICT_ERRORS[field]}), HTTPStatus.BAD_REQUEST
+        return user_serializer.jsonify(user_model)
     except ValidationError as _:
         return (
             jsonify(
@@ -138,6 +111,36 @@ def signup():
         return {"error": "Something went very wrong"}
 
 
+def taken_fields(username, email):
+    """Which of ``username`` and ``email`` are already registered, in one query."""
+    rows = (
+        db.session.query(UserModel.username, UserModel.email)
+        .filter(or_(UserModel.username == username, UserModel.email == email))
+        .all()
+    )
+    return [
+        field
+        for field, value in (("username", username), ("email", email))
+        if any(getattr(row, field) == value for row in rows)
+    ]
+
+
+def conflicting_field(error):
+    """The user column whose unique constraint ``error`` violated, if any."""
+    constraint = getattr(getattr(error.orig, "diag", None), "constraint_name", None)
+    message = str(error.orig)
+    for field in CONFLICT_ERRORS:
+        # Postgres names the constraint (users_<field>_key) and the key;
+        # SQLite reports "UNIQUE constraint failed: users.<field>".
+        if (
+            (constraint and f"_{field}_" in constraint)
+            or f"Key ({field})=" in message
+            or f"users.{field}" in message
+        ):
+            return field
+    return None
+
+
 # --- Login section ---
 @router.route("/login", methods=["POST"])
 @limiter.limit("5 per minute")
@@ -162,16 +165,13 @@ def login():
     if not user or not user.validate_password(credentials_dictionary["password"]):
         return jsonify({"error": "Login failed. Try again"}), HTTPStatus.UNAUTHORIZED
 
-    payload = {
-        "exp": datetime.now(timezone.utc) + timedelta(days=1),
-        "iat": datetime.now(timezone.utc),
-        "sub": str(user.id),
-        "role": user.role,
-    }
-    secret = SECRET
+    # Upgrade hashes made at an older cost while we hold the plaintext.
+    if user.needs_rehash():
+        user.password = credentials_dictionary["password"]
+        db.session.commit()
 
     try:
-        token = jwt.encode(payload, secret, algorithm="HS256")
+        token = issue_token(user)
         return jsonify({"message": "Login successful.", "token": token})
 
     except jwt.PyJWTError as _:
@@ -181,14 +181,26 @@ def login():
         )
 
 
+def issue_token(user):
+    """Signed JWT for ``user``, carrying the claims stateless mode relies on."""
+    payload = {
+        "exp": datetime.now(timezone.utc) + TOKEN_LIFETIME,
+        "iat": datetime.now(timezone.utc),
+        "sub": str(user.id),
+        "role": user.role,
+        "username": user.username,
+        "ver": user.token_version,
+    }
+    return jwt.encode(payload, SECRET, algorithm="HS256")
+
+
 # --- Get Current User section ---
 @router.route("/user", methods=["GET"])
 @secure_route
 def get_current_user():
     """Get the current user by their ID from the database."""
     try:
-        user = db.session.query(UserModel).get(g.current_user.id)
-        return user_serializer.jsonify(user)
+        return cached_user_response(g.current_user.id)
     except ValidationError as _:
         return {
             "errors": _.messages,
@@ -201,10 +213,53 @@ def get_current_user():
 # --- Display All Users section ---
 @router.route("/users", methods=["GET"])
 @role_required("admin", "superadmin")
+# Deleting a user leaves no newer updated_at behind, so only the ETag, which
+# counts the rows, can tell the listing changed.
+@conditional_get(lambda: [(UserModel, *user_filters())], last_modified=False)
 def get_current_users():
-    """Get all users from the database."""
-    user = db.session.query(UserModel).all()
-    return user_serializer.jsonify(user, many=True)
+    """List users by ascending id.
+
+    ``?role=`` filters by role. ``?after=<id>&limit=<n>`` returns one keyset
+    page, with a ``Link: rel="next"`` header while more users follow; without
+    ``limit`` every matching user is streamed. ``?format=ndjson`` (or
+    ``Accept: application/x-ndjson``) writes one user per line.
+    """
+    try:
+        after = int(request.args.get("after", 0))
+        limit = request.args.get("limit")
+        if limit is not None:
+            limit = int(limit)
+            if not 1 <= limit <= USERS_PAGE_MAX:
+                raise ValueError(f"limit must be between 1 and {USERS_PAGE_MAX}")
+    except ValueError as e:
+        return (
+            jsonify({"message": "Invalid pagination", "error": str(e)}),
+            HTTPStatus.BAD_REQUEST,
+        )
+
+    query = (
+        db.session.query(UserModel)
+        .filter(*user_filters(), UserModel.id > after)
+        .order_by(UserModel.id)
+    )
+    if limit is None:
+        return stream_rows(query, user_serializer.dump, ndjson=wants_ndjson())
+
+    # One extra row tells whether there is a next page.
+    users = query.limit(limit + 1).all()
+    response = render_rows(users[:limit], user_serializer.dump, ndjson=wants_ndjson())
+    if len(users) > limit:
+        args = request.args.copy()
+        args["after"] = users[limit - 1].id
+        next_url = f"{request.base_url}?{urlencode(list(args.items(multi=True)))}"
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response
+
+
+def user_filters():
+    """Criteria for the user listing's ``?role=`` filter."""
+    role = request.args.get("role")
+    return [UserModel.role == role] if role else []
 
 
 # --- Display Single User section ---
@@ -212,10 +267,25 @@ def get_current_users():
 @role_required("admin", "superadmin")
 def get_single_user(user_id):
     """Get a single user by their ID from the database."""
-    post = db.session.query(UserModel).get(user_id)
-    if post is None:
+    response = cached_user_response(user_id)
+    if response is None:
         return jsonify({"message": "user not found"}, HTTPStatus.NOT_FOUND)
-    return user_serializer.jsonify(post)
+    return response
+
+
+def cached_user_response(user_id):
+    """Serialized user from the shared user cache, or None if not found."""
+
+    def load_user():
+        user = db.session.query(UserModel).get(user_id)
+        return None if user is None else user_serializer.dump(user)
+
+    return cached_json_response(
+        ("user", user_id),
+        load_user,
+        [(UserModel, UserModel.id == user_id)],
+        cache=user_cache,
+    )
 
 
 # --- Update User section ---
@@ -239,6 +309,8 @@ def update_user(user_id):
         user.email = user_data.get("email", user.email)
         user.image = user_data.get("image", user.image)
         db.session.commit()
+        user_cache.bump()
+        forget_principal(user_id)
         return user_serializer.jsonify(user)
 
     except ValidationError as _:
@@ -260,10 +332,59 @@ def delete_user(user_id):
     if not user:
         return jsonify({"message": "user not found"}, HTTPStatus.NOT_FOUND)
 
+    revocations.revoke(user.id, REVOKE_ALL)
     user.remove()
+    user_cache.bump()
+    forget_principal(user_id)
     return jsonify({"error": "user deleted"})
 
 
+# --- Bulk Delete User section ---
+@router.route("/users", methods=["DELETE"])
+@role_required("admin", "superadmin")
+def delete_users():
+    """Delete every user listed in ``?ids=`` in one statement."""
+    try:
+        ids = parse_ids(request.args.get("ids"))
+    except ValueError as e:
+        return (
+            jsonify({"message": "Invalid ids", "error": str(e)}),
+            HTTPStatus.BAD_REQUEST,
+        )
+
+    try:
+        deleted = bulk_delete(UserModel, ids)
+        errors = missing_ids(ids, deleted, "User")
+        if not deleted:
+            db.session.rollback()
+            return (
+                jsonify({"message": "No users were deleted", "errors": errors}),
+                HTTPStatus.NOT_FOUND,
+            )
+
+        revocations.revoke_many(deleted, REVOKE_ALL)
+        db.session.commit()
+        user_cache.bump()
+        forget_principal(*deleted)
+        return (
+            jsonify(
+                {
+                    "message": f"{len(deleted)} users deleted",
+                    "deleted": sorted(deleted),
+                    "errors": errors,
+                }
+            ),
+            HTTPStatus.OK,
+        )
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return (
+            jsonify({"message": "Database error", "error": str(e)}),
+            HTTPStatus.INTERNAL_SERVER_ERROR,
+        )
+
+
 # --- Change Password section ---
 @router.route("/change-password", methods=["PUT"])
 @limiter.limit("5 per hour")
@@ -284,43 +405,31 @@ def change_password():
         return jsonify({"error": "Passwords do not match"}), HTTPStatus.BAD_REQUEST
 
     # Password validation (strength check)
-    if len(new_password) < 8:
-        return (
-            jsonify({"error": "Password must be at least 8 characters long"}),
-            HTTPStatus.BAD_REQUEST,
-        )
-    if not any(c.islower() for c in new_password):
-        return (
-            jsonify({"error": "Password must contain a lowercase letter"}),
-            HTTPStatus.BAD_REQUEST,
-        )
-    if not any(c.isupper() for c in new_password):
-        return (
-            jsonify({"error": "Password must contain an uppercase letter"}),
-            HTTPStatus.BAD_REQUEST,
-        )
-    if not any(c.isdigit() for c in new_password):
-        return (
-            jsonify({"error": "Password must contain a digit"}),
-            HTTPStatus.BAD_REQUEST,
-        )
-    if not any(c in "!@#$%&*" for c in new_password):
-        return (
-            jsonify({"error": "Password must contain a special character (!@#$%&*)"}),
-            HTTPStatus.BAD_REQUEST,
-        )
+    problem = password_problem(new_password)
+    if problem:
+        return jsonify({"error": problem}), HTTPStatus.BAD_REQUEST
 
     # ✅ Use the `password` setter, not `set_password`
     user.password = new_password
+    # Sign out every other session; the caller gets a fresh token.
+    user.token_version += 1
+    revocations.revoke(user.id, user.token_version)
     db.session.commit()
-
-    return jsonify({"message": "Password changed successfully"}), HTTPStatus.OK
+    user_cache.bump()
+    forget_principal(user.id)
+
+    return (
+        jsonify(
+            {"message": "Password changed successfully", "token": issue_token(user)}
+        ),
+        HTTPStatus.OK,
+    )
 
 
 @router.route("/send-confirmation", methods=["POST"])
 @limiter.limit("3 per hour")
 def send_confirmation():
-    """Send a confirmation email to a user."""
+    """Queue a confirmation email to a user; mail_sender.py delivers it."""
     data = request.json
     email = data.get("email")
     username = data.get("username")
@@ -333,17 +442,14 @@ def send_confirmation():
     if not app.config.get("MAIL_USERNAME"):
         return jsonify({"error": "Email is not configured"}), 503
 
-    try:
-        msg = Message(
-            subject="Confirmation Email",
-            sender=app.config["MAIL_USERNAME"],
-            recipients=[email],
-        )
-        msg.body = f"Hi {username}, thanks for registering to our website!"
-        mail.send(msg)
-        return jsonify({"message": "Confirmation email sent."}), 200
-    except SMTPException as _:
-        return jsonify({"error": "Failed to send email"}), 500
+    enqueue(
+        sender=app.config["MAIL_USERNAME"],
+        recipient=email,
+        subject="Confirmation Email",
+        body=f"Hi {username}, thanks for registering to our website!",
+    )
+    db.session.commit()
+    return jsonify({"message": "Confirmation email queued."}), HTTPStatus.ACCEPTED
 
 
 @router.route("/user/<int:user_id>/role", methods=["PUT"])
@@ -365,5 +471,9 @@ def update_user_role(user_id):
         return {"error": "User not found"}, HTTPStatus.NOT_FOUND
 
     user.role = new_role
+    user.token_version += 1
+    revocations.revoke(user.id, user.token_version)
     db.session.commit()
+    user_cache.bump()
+    forget_principal(user_id)
     return user_serializer.jsonify(user)
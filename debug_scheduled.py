@@ -1,46 +1,37 @@
 from application import app, db
+from models.menu_schedule_model import MenuScheduleModel
 from models.menus_model import MenusModel
-from datetime import datetime
+from lib.menu_schedule import bst_now, due_versions
 
 
 def debug_scheduled_tasks():
     """Debug script to check scheduled tasks in database"""
     with app.app_context():
-        # Check all scheduled tasks
-        all_scheduled = MenusModel.query.filter(
-            MenusModel.scheduled_at.isnot(None)
-        ).all()
+        # Check all queued versions
+        all_scheduled = (
+            db.session.query(MenuScheduleModel, MenusModel)
+            .join(MenusModel, MenusModel.id == MenuScheduleModel.menu_id)
+            .filter(MenuScheduleModel.applied.is_(False))
+            .order_by(MenuScheduleModel.due_at)
+            .all()
+        )
         print(f"=== Found {len(all_scheduled)} total scheduled tasks ===")
 
-        for task in all_scheduled:
-            print(f"Task {task.id}: {task.menus_type}")
-            print(f"  scheduled_at: {task.scheduled_at}")
+        for task, menu in all_scheduled:
+            print(f"Task {task.id}: menu {menu.id} ({menu.menus_type})")
+            print(f"  due_at: {task.due_at}")
             print(f"  applied: {task.applied}")
-            print(f"  scheduled_text: {task.scheduled_text}")
-            print(f"  scheduled_url: {task.scheduled_url}")
+            print(f"  menus_text: {task.menus_text}")
+            print(f"  menus_url: {task.menus_url}")
             print("---")
 
         # Check tasks due now
-        now = datetime.now()
-        due_tasks = MenusModel.query.filter(
-            MenusModel.scheduled_at <= now,
-            MenusModel.applied == False,
-            MenusModel.scheduled_at.isnot(None),
-        ).all()
+        now = bst_now()
+        due_tasks = due_versions(now)
         print(f"\n=== Found {len(due_tasks)} tasks due now (current time: {now}) ===")
 
-        for task in due_tasks:
-            print(
-                f"Due Task {task.id}: {task.menus_type}, scheduled for {task.scheduled_at}"
-            )
-
-        # Check all menus to see their applied status
-        all_menus = MenusModel.query.all()
-        print(f"\n=== All menus and their applied status ===")
-        for menu in all_menus:
-            print(
-                f"Menu {menu.id} ({menu.menus_type}): applied={getattr(menu, 'applied', 'NOT SET')}"
-            )
+        for task, menu in due_tasks:
+            print(f"Due Task {task.id}: {menu.menus_type}, scheduled for {task.due_at}")
 
 
 if __name__ == "__main__":
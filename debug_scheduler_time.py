@@ -1,6 +1,6 @@
 from application import app, db
-from models.menus_model import MenusModel
-from datetime import datetime
+from models.menu_schedule_model import MenuScheduleModel
+from lib.menu_schedule import bst_now, due_versions
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -11,43 +11,32 @@ def debug_scheduler_time():
     """Debug the scheduler's time comparison logic"""
     with app.app_context():
         try:
-            now = datetime.now()
+            now = bst_now()
             logger.info(f"Scheduler current time: {now}")
             logger.info(f"Scheduler current time ISO: {now.isoformat()}")
 
-            # Get all scheduled tasks
-            all_scheduled = MenusModel.query.filter(
-                MenusModel.scheduled_at.isnot(None)
+            # Get all queued versions
+            all_scheduled = MenuScheduleModel.query.filter(
+                MenuScheduleModel.applied.is_(False)
             ).all()
             logger.info(f"Found {len(all_scheduled)} total scheduled tasks")
 
             for task in all_scheduled:
-                logger.info(f"Task {task.id} ({task.menus_type}):")
-                logger.info(f"  scheduled_at: {task.scheduled_at}")
-                logger.info(f"  scheduled_at type: {type(task.scheduled_at)}")
+                logger.info(f"Task {task.id} (menu {task.menu_id}):")
+                logger.info(f"  due_at: {task.due_at}")
+                logger.info(f"  due_at type: {type(task.due_at)}")
                 logger.info(f"  applied: {task.applied}")
-                logger.info(
-                    f"  is due? {task.scheduled_at <= now if task.scheduled_at else 'N/A'}"
-                )
-                diff_sec = (
-                    (task.scheduled_at - now).total_seconds()
-                    if task.scheduled_at else "N/A"
-                )
+                logger.info(f"  is due? {task.due_at <= now}")
+                diff_sec = (task.due_at - now).total_seconds()
                 logger.info("  time diff: %s seconds", diff_sec)
                 logger.info("---")
 
             # Use the exact same query as the scheduler
-            due_tasks = MenusModel.query.filter(
-                MenusModel.scheduled_at <= now,
-                MenusModel.applied == False,
-                MenusModel.scheduled_at.isnot(None),
-            ).all()
+            due_tasks = due_versions(now)
 
             logger.info(f"Tasks due according to scheduler query: {len(due_tasks)}")
-            for task in due_tasks:
-                logger.info(
-                    f"Due task: {task.id} ({task.menus_type}) - {task.scheduled_at}"
-                )
+            for task, menu in due_tasks:
+                logger.info(f"Due task: {task.id} ({menu.menus_type}) - {task.due_at}")
 
         except Exception as e:
             logger.error(f"Debug error: {str(e)}")
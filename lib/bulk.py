@@ -0,0 +1,152 @@
+"""Set-based writes that touch many rows in a handful of statements."""
+
+from sqlalchemy import any_, bindparam, case, column, delete, insert, update, values
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from application import db
+
+
+def bulk_update(model, rows, *criteria, returning=()):
+    """Write ``rows`` (``{id: {column: value}}``) to ``model`` set-wise.
+
+    Rows setting the same columns are written by one UPDATE, so a uniform
+    batch costs a single statement; only rows also matching ``criteria`` are
+    written. Returns the written rows keyed by id, with the updated columns
+    and ``returning``; ids absent from the result did not match.
+    """
+    groups = {}
+    for key, row in rows.items():
+        groups.setdefault(tuple(sorted(row)), {})[key] = row
+
+    written = {}
+    for fields, group in groups.items():
+        statement = (
+            _update_statement(model, fields, group)
+            .where(*criteria)
+            .returning(model.id, *[getattr(model, name) for name in fields], *returning)
+            .execution_options(synchronize_session=False)
+        )
+        written.update((row.id, row._asdict()) for row in db.session.execute(statement))
+    return written
+
+
+def _update_statement(model, fields, rows):
+    """UPDATE setting ``fields`` of every row in ``rows`` from its own values.
+
+    Postgres joins the table against a ``VALUES`` list (``UPDATE ... FROM``);
+    SQLite cannot name the columns of a ``VALUES`` list, so other dialects get
+    one CASE expression per column instead.
+    """
+    table = model.__table__
+    if db.session.get_bind().dialect.name == "postgresql":
+        batch = values(
+            column("id", table.c.id.type),
+            *[column(name, table.c[name].type) for name in fields],
+            name="batch",
+        ).data([(key, *[row[name] for name in fields]) for key, row in rows.items()])
+        return (
+            update(model)
+            .where(model.id == batch.c.id)
+            .values({name: batch.c[name] for name in fields})
+        )
+
+    return (
+        update(model)
+        .where(model.id.in_(list(rows)))
+        .values(
+            {
+                name: case(
+                    {key: row[name] for key, row in rows.items()}, value=model.id
+                )
+                for name in fields
+            }
+        )
+    )
+
+
+def collect_rows(items, required=(), optional=()):
+    """Validate ``[{"id": ..., field: "text"}]`` items for ``bulk_update``.
+
+    Each item needs an integer ``id``, every ``required`` field and at least
+    one field overall, all as strings. Returns ``(rows, errors)``: ``rows``
+    maps ids to their columns, ``errors`` holds one report per bad item.
+    """
+    rows = {}
+    errors = []
+    if not isinstance(items, list):
+        return rows, [{"error": "Expected an array"}]
+
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({"index": index, "error": "Item must be an object"})
+            continue
+        key = item.get("id")
+        if not isinstance(key, int) or isinstance(key, bool):
+            errors.append({"index": index, "error": "'id' must be an integer"})
+            continue
+
+        row = {name: item[name] for name in (*required, *optional) if name in item}
+        unknown = set(item) - set(row) - {"id"}
+        missing = [name for name in required if name not in row]
+        if unknown or missing or not row:
+            fields = ", ".join(sorted(unknown) or missing or optional)
+            problem = "Unknown fields" if unknown else "Missing fields"
+            errors.append({"index": index, "id": key, "error": f"{problem}: {fields}"})
+        elif not all(isinstance(value, str) for value in row.values()):
+            errors.append(
+                {"index": index, "id": key, "error": "Values must be strings"}
+            )
+        else:
+            rows[key] = row
+    return rows, errors
+
+
+def parse_ids(raw):
+    """Parse an ``?ids=1,2,3`` parameter; raises ValueError when malformed."""
+    ids = [int(part) for part in (raw or "").split(",") if part.strip()]
+    if not ids:
+        raise ValueError("Expected a comma-separated list of ids")
+    return list(dict.fromkeys(ids))
+
+
+def id_in(model, ids):
+    """``model.id IN ids``, bound as one array (``= ANY(:ids)``) on Postgres."""
+    if db.session.get_bind().dialect.name == "postgresql":
+        return model.id == any_(
+            bindparam("ids", ids, type_=ARRAY(model.__table__.c.id.type), unique=True)
+        )
+    return model.id.in_(ids)
+
+
+def bulk_delete(model, ids, *criteria):
+    """Delete the ``ids`` rows of ``model`` matching ``criteria`` in one statement.
+
+    Returns the ids actually deleted. The caller commits.
+    """
+    statement = (
+        delete(model)
+        .where(id_in(model, ids), *criteria)
+        .returning(model.id)
+        .execution_options(synchronize_session=False)
+    )
+    return set(db.session.scalars(statement))
+
+
+def missing_ids(requested, found, label):
+    """Per-item error reports for the ``requested`` ids absent from ``found``."""
+    return [
+        {"index": index, "id": key, "error": f"{label} {key} not found"}
+        for index, key in enumerate(requested)
+        if key not in found
+    ]
+
+
+def bulk_insert(model, schema, items):
+    """Validate ``items`` in one ``schema`` pass and insert them in one statement.
+
+    ``schema`` must be built with ``load_instance=False``. When any item is
+    invalid nothing is inserted and marshmallow's ValidationError is raised,
+    its messages keyed by item index. Returns the created instances.
+    """
+    rows = schema.load(items, many=True)
+    return db.session.scalars(insert(model).returning(model), rows).all()
@@ -0,0 +1,151 @@
+"""Versioned caches for public payloads, stored in the configured cache backend."""
+
+import hashlib
+import json
+from datetime import datetime
+from http import HTTPStatus
+
+from flask import Response, current_app, request
+
+from config.environment import CACHE_URL, CONTENT_CACHE_TTL
+from lib.cache_backends import get_cache_backend
+from lib.compression import MIN_COMPRESS_SIZE, compress, negotiate_encoding
+from lib.conditional import change_marker, http_last_modified, is_not_modified
+
+backend = get_cache_backend(CACHE_URL)
+
+
+class CachedPayload:
+    """A payload's JSON bytes, its strong ETag and when its rows last changed."""
+
+    __slots__ = ("key", "body", "etag", "last_modified")
+
+    def __init__(self, key, body, last_modified=None, etag=None):
+        self.key = key
+        self.body = body
+        self.etag = etag or hashlib.sha256(body).hexdigest()[:32]
+        self.last_modified = last_modified
+
+    def dumps(self):
+        """Serialize for the backend: a JSON header line, then the body."""
+        header = {
+            "etag": self.etag,
+            "last_modified": (
+                self.last_modified.isoformat() if self.last_modified else None
+            ),
+        }
+        return json.dumps(header).encode("utf-8") + b"\n" + self.body
+
+    @classmethod
+    def loads(cls, key, raw):
+        """Rebuild an entry stored by ``dumps``."""
+        header, _, body = raw.partition(b"\n")
+        header = json.loads(header)
+        last_modified = header["last_modified"]
+        if last_modified is not None:
+            last_modified = datetime.fromisoformat(last_modified)
+        return cls(key, body, last_modified, header["etag"])
+
+
+class PayloadCache:
+    """Holds payloads keyed by a version counter kept in the backend.
+
+    Write paths call ``bump()``; entries built for an older version are never
+    served again. With a shared backend the bump reaches every worker.
+    ``store`` defaults to the backend configured by CACHE_URL.
+    """
+
+    def __init__(self, namespace, ttl=CONTENT_CACHE_TTL, store=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.store = backend if store is None else store
+        self._version_key = f"{namespace}:version"
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """Call ``listener()`` after every ``bump()``."""
+        self._listeners.append(listener)
+
+    @property
+    def version(self):
+        """Current version of this namespace."""
+        return self.store.counter(self._version_key)
+
+    def bump(self):
+        """Invalidate every cached payload of this namespace."""
+        version = self.store.incr(self._version_key)
+        for listener in self._listeners:
+            listener()
+        return version
+
+    def _key(self, key, version):
+        return f"{self.namespace}:{version}:{key!r}"
+
+    def get(self, key):
+        """Return the live entry for ``key`` or None."""
+        backend_key = self._key(key, self.version)
+        raw = self.store.get(backend_key)
+        if raw is None:
+            return None
+        return CachedPayload.loads(backend_key, raw)
+
+    def set(self, key, data, version, last_modified=None):
+        """Store ``data`` built while the namespace was at ``version``."""
+        body = current_app.json.response(data).get_data()
+        entry = CachedPayload(self._key(key, version), body, last_modified)
+        # A write landed while we were loading: hand the payload back but
+        # don't keep it around.
+        if version == self.version:
+            self.store.set(entry.key, entry.dumps(), self.ttl)
+        return entry
+
+    def variant(self, entry, encoding):
+        """The entry's body compressed with ``encoding``, computed once per entry."""
+        variant_key = f"{entry.key}:{encoding}"
+        body = self.store.get(variant_key)
+        if body is None:
+            body = compress(entry.body, encoding, best=True)
+            self.store.set(variant_key, body, self.ttl)
+        return body
+
+
+content_cache = PayloadCache("content")
+user_cache = PayloadCache("users")
+
+
+def cached_json_response(key, loader, sources=None, cache=content_cache):
+    """Serve ``loader()`` from ``cache``, answering conditional requests with 304.
+
+    ``sources`` lists the ``(model, *criteria)`` rows behind the payload; on a
+    cache miss their ``max(updated_at)`` is checked against If-Modified-Since
+    before anything is loaded. Returns None when ``loader`` finds nothing.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        version = cache.version
+        last_modified = change_marker(*sources)[0] if sources else None
+        if is_not_modified(last_modified):
+            response = Response(status=HTTPStatus.NOT_MODIFIED)
+            response.last_modified = http_last_modified(last_modified)
+            return response
+
+        data = loader()
+        if data is None:
+            return None
+        entry = cache.set(key, data, version, last_modified)
+
+    encoding = None
+    if len(entry.body) >= MIN_COMPRESS_SIZE:
+        encoding = negotiate_encoding()
+
+    if encoding is None:
+        response = Response(entry.body, mimetype="application/json")
+        response.set_etag(entry.etag)
+    else:
+        response = Response(cache.variant(entry, encoding), mimetype="application/json")
+        response.headers["Content-Encoding"] = encoding
+        response.set_etag(f"{entry.etag}-{encoding}")
+    response.vary.add("Accept-Encoding")
+    if entry.last_modified is not None:
+        response.last_modified = http_last_modified(entry.last_modified)
+    return response.make_conditional(request)
@@ -0,0 +1,118 @@
+"""Cache storage backends shared by the payload caches.
+
+Backends store bytes under string keys. ``memory://`` keeps them in a
+per-process LRU; ``redis://`` shares them (and the invalidation counters)
+between every gunicorn worker and the scheduler process.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # only needed when CACHE_URL points at Redis
+    redis = None
+
+
+class CacheBackend:
+    """Interface implemented by every cache backend."""
+
+    def get(self, key):
+        """Return the bytes stored under ``key`` or None."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        """Store ``value`` under ``key``, expiring after ``ttl`` seconds."""
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        """Remove ``keys``."""
+        raise NotImplementedError
+
+    def counter(self, key):
+        """Current value of the counter ``key`` (0 if never incremented)."""
+        raise NotImplementedError
+
+    def incr(self, key):
+        """Increment the counter ``key`` and return its new value."""
+        raise NotImplementedError
+
+
+class LocalLRUBackend(CacheBackend):
+    """Bounded in-process LRU. Counters are kept apart so they are never evicted."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._counters = {}
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def counter(self, key):
+        return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisBackend(CacheBackend):
+    """Backend speaking the Redis protocol, shared by every process."""
+
+    def __init__(self, url, prefix="chezflo:"):
+        if redis is None:
+            raise RuntimeError("CACHE_URL points at Redis but redis is not installed")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self._client.set(self.prefix + key, value, ex=ttl or None)
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*(self.prefix + key for key in keys))
+
+    def counter(self, key):
+        value = self._client.get(self.prefix + key)
+        return int(value) if value is not None else 0
+
+    def incr(self, key):
+        return self._client.incr(self.prefix + key)
+
+
+def get_cache_backend(url):
+    """Build the backend configured by ``url`` (``memory://`` or ``redis://``)."""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    if url.startswith("memory://"):
+        return LocalLRUBackend()
+    raise ValueError(f"Unsupported CACHE_URL: {url}")
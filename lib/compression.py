@@ -0,0 +1,65 @@
+"""Negotiated gzip/brotli compression of JSON responses."""
+
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent as-is: the headers would cost more.
+MIN_COMPRESS_SIZE = 500
+
+# On-the-fly responses favour speed; cached payloads are compressed once per
+# content version, so they can afford the best ratio.
+FAST_LEVELS = {"br": 4, "gzip": 6}
+BEST_LEVELS = {"br": 11, "gzip": 9}
+
+
+def supported_encodings():
+    """Encodings this process can produce, in order of preference."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate_encoding():
+    """The best encoding accepted by the current request, or None."""
+    return request.accept_encodings.best_match(supported_encodings())
+
+
+def compress(body, encoding, best=False):
+    """Compress ``body`` with ``encoding`` ("br" or "gzip")."""
+    level = (BEST_LEVELS if best else FAST_LEVELS)[encoding]
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def compress_response(response):
+    """``after_request`` hook compressing JSON bodies the client accepts."""
+    if response.mimetype != "application/json":
+        return response
+    response.vary.add("Accept-Encoding")
+
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code != 200
+        or "Content-Encoding" in response.headers
+        or response.content_length is None
+        or response.content_length < MIN_COMPRESS_SIZE
+    ):
+        return response
+
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    response.set_data(compress(response.get_data(), encoding))
+    response.headers["Content-Encoding"] = encoding
+    # Each representation needs its own validator.
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
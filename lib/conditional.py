@@ -0,0 +1,101 @@
+"""Last-Modified / If-Modified-Since support driven by ``updated_at`` columns."""
+
+from datetime import timezone
+from functools import wraps
+from http import HTTPStatus
+
+from flask import make_response, request
+from sqlalchemy import func, select
+
+from application import db
+
+
+def change_marker(*sources):
+    """Newest ``updated_at`` and row count over ``(model, *criteria)`` sources.
+
+    All sources are aggregated in a single round trip. The row count is part
+    of the marker so that deleting a row, which leaves ``max(updated_at)``
+    untouched, still changes the ETag. If-Modified-Since only sees the
+    timestamp: sources built from carousels, menus or grid rows must include
+    their content row, whose ``updated_at`` is touched on every child write
+    (``models/content_changes.py``).
+    """
+    columns = []
+    for model, *criteria in sources:
+        columns.append(
+            select(func.max(model.updated_at)).where(*criteria).scalar_subquery()
+        )
+        columns.append(
+            select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+        )
+    row = db.session.query(*columns).one()
+
+    stamps = [stamp for stamp in row[0::2] if stamp is not None]
+    last_modified = max(stamps) if stamps else None
+    return last_modified, sum(row[1::2])
+
+
+def http_last_modified(last_modified):
+    """``last_modified`` as an aware UTC datetime at HTTP's one-second precision."""
+    return last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+
+
+def marker_etag(marker):
+    """Weak ETag for a change marker."""
+    last_modified, count = marker
+    stamp = last_modified.timestamp() if last_modified else 0
+    return f"{count}-{stamp}"
+
+
+def is_not_modified(last_modified, etag=None, weak=True):
+    """Whether the request's validators show the client copy is current.
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+    """
+    if request.if_none_match:
+        if etag is None:
+            return False
+        # Compressed representations carry an encoding suffix on the ETag.
+        candidates = [etag] + [f"{etag}-{encoding}" for encoding in ("br", "gzip")]
+        contains = (
+            request.if_none_match.contains_weak
+            if weak
+            else request.if_none_match.contains
+        )
+        return any(contains(candidate) for candidate in candidates)
+    if last_modified is None or request.if_modified_since is None:
+        return False
+    return http_last_modified(last_modified) <= request.if_modified_since
+
+
+def conditional_get(sources, last_modified=True):
+    """Decorator answering conditional GETs from a cheap ``max(updated_at)`` query.
+
+    ``sources`` receives the view's arguments and returns the
+    ``(model, *criteria)`` tuples whose rows make up the response. Pass
+    ``last_modified=False`` when deleting a row touches none of them: the
+    response is then validated by its ETag alone.
+    """
+
+    def decorator(route_function):
+        @wraps(route_function)
+        def wrapper(*args, **kwargs):
+            marker = change_marker(*sources(*args, **kwargs))
+            etag = marker_etag(marker)
+            modified_at = marker[0] if last_modified else None
+
+            if is_not_modified(modified_at, etag):
+                response = make_response("", HTTPStatus.NOT_MODIFIED)
+            else:
+                response = make_response(route_function(*args, **kwargs))
+                if response.status_code != HTTPStatus.OK:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if modified_at is not None:
+                response.last_modified = http_last_modified(modified_at)
+            return response
+
+        return wrapper
+
+    return decorator
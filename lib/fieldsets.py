@@ -0,0 +1,56 @@
+"""Parsing of ``?fields=`` sparse fieldset parameters."""
+
+
+class FieldsetError(ValueError):
+    """Raised when ``?fields=`` names a field the endpoint does not expose."""
+
+
+def column_names(model):
+    """Names of the mapped columns of ``model``."""
+    return [column.key for column in model.__table__.columns]
+
+
+def parse_fields(raw, columns, relations=None):
+    """Split ``about_title,menus.menus_url`` into top-level and nested fields.
+
+    Returns None when ``raw`` is empty, otherwise ``(fields, nested)``:
+    ``fields`` lists the requested top-level columns and ``nested`` maps each
+    requested relation to the set of its columns (empty meaning all of them).
+    """
+    if not raw:
+        return None
+
+    relations = relations or {}
+    fields = []
+    nested = {}
+    whole = set()
+    for name in sorted({part.strip() for part in raw.split(",") if part.strip()}):
+        relation, _, child = name.partition(".")
+        if relation in relations:
+            requested = nested.setdefault(relation, set())
+            if not child:
+                whole.add(relation)
+            elif child in relations[relation]:
+                requested.add(child)
+            else:
+                raise FieldsetError(f"Unknown field '{name}'")
+        elif name in columns:
+            fields.append(name)
+        else:
+            raise FieldsetError(f"Unknown field '{name}'")
+
+    # A bare relation name asks for all of its columns.
+    for relation in whole:
+        nested[relation] = set()
+    return fields, nested
+
+
+def marshmallow_only(fields, nested):
+    """The ``only=`` tuple for a schema dumping ``fields`` and ``nested``."""
+    only = list(fields)
+    for relation, requested in nested.items():
+        if requested:
+            only.extend(f"{relation}.{child}" for child in sorted(requested))
+        else:
+            only.append(relation)
+    return tuple(only)
@@ -0,0 +1,118 @@
+"""Sparse ordering keys for grid tiles.
+
+Tiles are ordered by ``position``, spaced ``POSITION_GAP`` apart. Moving a
+tile gives it a position between its new neighbours, so a drag rewrites a
+single row. When two neighbours end up adjacent, the content's tiles are
+renumbered in one statement, either on the spot or by the scheduler.
+"""
+
+from sqlalchemy import distinct, func, select, update
+
+from application import db
+from models.grid_model import GridModel
+
+POSITION_GAP = 1024
+
+
+def position_between(before, after):
+    """A position strictly between ``before`` and ``after`` (None = open end).
+
+    Returns None when the two are adjacent and no integer fits between them.
+    """
+    if before is None and after is None:
+        return POSITION_GAP
+    if before is None:
+        return after - POSITION_GAP
+    if after is None:
+        return before + POSITION_GAP
+    if after - before < 2:
+        return None
+    return before + (after - before) // 2
+
+
+def next_positions(content_id, count=1):
+    """``count`` positions after a content's last tile, ``POSITION_GAP`` apart."""
+    last = db.session.scalar(
+        select(func.max(GridModel.position)).where(GridModel.content_id == content_id)
+    )
+    start = (last or 0) + POSITION_GAP
+    return [start + index * POSITION_GAP for index in range(count)]
+
+
+def rebalance(content_id):
+    """Renumber a content's tiles ``POSITION_GAP`` apart, keeping their order."""
+    ranked = (
+        select(
+            GridModel.id,
+            (
+                func.row_number().over(order_by=(GridModel.position, GridModel.id))
+                * POSITION_GAP
+            ).label("position"),
+        )
+        .where(GridModel.content_id == content_id)
+        .subquery()
+    )
+    db.session.execute(
+        update(GridModel)
+        .where(GridModel.id == ranked.c.id)
+        .values(position=ranked.c.position)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def crowded_contents():
+    """Ids of contents with two tiles too close to insert between."""
+    previous = func.lag(GridModel.position).over(
+        partition_by=GridModel.content_id,
+        order_by=(GridModel.position, GridModel.id),
+    )
+    gaps = select(
+        GridModel.content_id, (GridModel.position - previous).label("gap")
+    ).subquery()
+    return db.session.scalars(
+        select(distinct(gaps.c.content_id)).where(gaps.c.gap < 2)
+    ).all()
+
+
+def move_tile(content_id, grid_id, after_id=None):
+    """Place tile ``grid_id`` right after ``after_id`` (None = first).
+
+    Writes only the moved tile unless its neighbours have run out of room.
+    Returns the new position, or None when either tile is not in the content.
+    The caller commits.
+    """
+    if after_id == grid_id:
+        return db.session.scalar(
+            select(GridModel.position).where(
+                GridModel.id == grid_id, GridModel.content_id == content_id
+            )
+        )
+
+    for attempt in range(2):
+        before = None
+        if after_id is not None:
+            before = db.session.scalar(
+                select(GridModel.position).where(
+                    GridModel.id == after_id, GridModel.content_id == content_id
+                )
+            )
+            if before is None:
+                return None
+
+        next_tile = select(func.min(GridModel.position)).where(
+            GridModel.content_id == content_id, GridModel.id != grid_id
+        )
+        if before is not None:
+            next_tile = next_tile.where(GridModel.position > before)
+        position = position_between(before, db.session.scalar(next_tile))
+        if position is not None or attempt:
+            break
+        rebalance(content_id)
+
+    return db.session.scalar(
+        update(GridModel)
+        .where(GridModel.id == grid_id, GridModel.content_id == content_id)
+        .values(position=position)
+        .returning(GridModel.position)
+        .execution_options(synchronize_session=False)
+    )
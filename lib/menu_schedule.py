@@ -0,0 +1,218 @@
+"""Queued menu versions in the ``menu_schedule`` table.
+
+A menu may have any number of versions queued. Each one replaces the menu's
+text and/or URL once its ``due_at`` (naive BST, like the rest of the
+scheduling code) has passed. Applied versions stay in the table for a while
+and are then archived in batches, so the table holds roughly the pending
+versions and the due query stays proportional to what is due.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, insert, select, update
+
+from application import db
+from config.environment import SCHEDULE_ARCHIVE_AFTER_DAYS, SCHEDULE_ARCHIVE_BATCH
+from lib.bulk import bulk_update, id_in
+from lib.schedule_signal import notify_scheduled
+from models.menu_schedule_model import MenuScheduleArchiveModel, MenuScheduleModel
+from models.menus_model import MenusModel
+from models.mixins import utcnow
+
+BST = timezone(timedelta(hours=1))  # BST = UTC+1
+
+
+def bst_now():
+    """Current BST time as a naive datetime, matching ``due_at`` in the DB."""
+    return datetime.now(timezone.utc).astimezone(BST).replace(tzinfo=None)
+
+
+def schedule_version(menu, due_at, menus_text=None, menus_url=None):
+    """Queue a version of ``menu`` due at ``due_at`` and wake the scheduler.
+
+    The version joins the caller's transaction.
+    """
+    version = MenuScheduleModel(
+        menu_id=menu.id, menus_text=menus_text, menus_url=menus_url, due_at=due_at
+    )
+    db.session.add(version)
+    notify_scheduled(due_at)
+    return version
+
+
+def pending_versions(content_id):
+    """``(version, menu)`` pairs not yet applied for a content, soonest first."""
+    return (
+        db.session.query(MenuScheduleModel, MenusModel)
+        .join(MenusModel, MenusModel.id == MenuScheduleModel.menu_id)
+        .filter(
+            MenuScheduleModel.applied.is_(False),
+            MenusModel.content_id == content_id,
+        )
+        .order_by(MenuScheduleModel.due_at, MenuScheduleModel.id)
+        .all()
+    )
+
+
+def due_versions(now, content_id=None):
+    """``(version, menu)`` pairs due by ``now``, in the order to apply them."""
+    query = (
+        db.session.query(MenuScheduleModel, MenusModel)
+        .join(MenusModel, MenusModel.id == MenuScheduleModel.menu_id)
+        .filter(
+            MenuScheduleModel.applied.is_(False),
+            MenuScheduleModel.due_at <= now,
+        )
+    )
+    if content_id is not None:
+        query = query.filter(MenusModel.content_id == content_id)
+    return query.order_by(MenuScheduleModel.due_at, MenuScheduleModel.id).all()
+
+
+def apply_due(now, content_id=None, limit=None):
+    """Apply versions due by ``now``, optionally for one content or ``limit`` menus.
+
+    Menus with due versions are locked with ``SELECT ... FOR UPDATE SKIP
+    LOCKED``, then an ``UPDATE ... RETURNING`` marks every due version of
+    the locked menus applied. Each menu belongs to one caller at a time,
+    while other scheduler workers, Celery and the manual endpoint move on to
+    the remaining menus; no leader is needed and each version is applied
+    exactly once. The claim is a separate statement so that it sees the
+    versions a previous holder of the lock applied, and takes all of a
+    menu's due versions or none, keeping them in order. The menus are then
+    written with ``bulk_update``; of several due versions of a menu the
+    latest wins, field by field. Joins the caller's transaction, and the
+    locks are held until it ends.
+
+    Returns ``(claimed, menus)``: the ids of the versions applied and the
+    updated menus keyed by id, with their type, text and URL.
+    """
+    pending = (
+        MenuScheduleModel.applied.is_(False),
+        MenuScheduleModel.due_at <= now,
+    )
+    due_menus = (
+        select(MenusModel.id)
+        .where(
+            select(MenuScheduleModel.id)
+            .where(MenuScheduleModel.menu_id == MenusModel.id, *pending)
+            .exists()
+        )
+        .order_by(
+            select(func.min(MenuScheduleModel.due_at))
+            .where(MenuScheduleModel.menu_id == MenusModel.id, *pending)
+            .scalar_subquery(),
+            MenusModel.id,
+        )
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    if content_id is not None:
+        due_menus = due_menus.where(MenusModel.content_id == content_id)
+    menu_ids = db.session.scalars(due_menus).all()
+    if not menu_ids:
+        return [], {}
+
+    claim = (
+        update(MenuScheduleModel)
+        .where(MenuScheduleModel.menu_id.in_(menu_ids), *pending)
+        .values(applied=True, applied_at=utcnow())
+        .returning(
+            MenuScheduleModel.id,
+            MenuScheduleModel.menu_id,
+            MenuScheduleModel.menus_text,
+            MenuScheduleModel.menus_url,
+            MenuScheduleModel.due_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    claimed = db.session.execute(claim).all()
+
+    changes = {}
+    for version in sorted(claimed, key=lambda version: (version.due_at, version.id)):
+        row = changes.setdefault(version.menu_id, {})
+        # An empty field leaves the menu's current value in place.
+        if version.menus_text:
+            row["menus_text"] = version.menus_text
+        if version.menus_url:
+            row["menus_url"] = version.menus_url
+
+    menus = bulk_update(
+        MenusModel,
+        {menu_id: row for menu_id, row in changes.items() if row},
+        returning=(MenusModel.menus_type, MenusModel.menus_text, MenusModel.menus_url),
+    )
+    return [version.id for version in claimed], menus
+
+
+def any_due(now):
+    """Whether any version due by ``now`` is still waiting to be applied."""
+    return db.session.query(
+        select(MenuScheduleModel.id)
+        .where(
+            MenuScheduleModel.applied.is_(False),
+            MenuScheduleModel.due_at <= now,
+        )
+        .exists()
+    ).scalar()
+
+
+def pending_due_times():
+    """Distinct due times of every version not yet applied."""
+    rows = (
+        db.session.query(MenuScheduleModel.due_at)
+        .filter(MenuScheduleModel.applied.is_(False))
+        .distinct()
+        .all()
+    )
+    return [due_at for (due_at,) in rows]
+
+
+def archive_applied(
+    older_than=timedelta(days=SCHEDULE_ARCHIVE_AFTER_DAYS),
+    batch_size=SCHEDULE_ARCHIVE_BATCH,
+):
+    """Move applied versions due before ``older_than`` ago to the archive.
+
+    Each batch is copied and deleted in its own transaction, so a large
+    backlog never holds locks for long; rows another scheduler worker is
+    archiving are skipped. Returns the number of rows moved.
+    """
+    cutoff = bst_now() - older_than
+    # Every archive column except its own key, copied from the live row.
+    copied = {
+        name: MenuScheduleModel.__table__.c[name]
+        for name in MenuScheduleArchiveModel.__table__.columns.keys()
+        if name not in ("id", "schedule_id")
+    }
+    names = ["schedule_id", *copied]
+    source = [MenuScheduleModel.id, *copied.values()]
+
+    moved = 0
+    while True:
+        ids = db.session.scalars(
+            select(MenuScheduleModel.id)
+            .where(
+                MenuScheduleModel.applied.is_(True),
+                MenuScheduleModel.due_at < cutoff,
+            )
+            .order_by(MenuScheduleModel.due_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not ids:
+            break
+
+        db.session.execute(
+            insert(MenuScheduleArchiveModel).from_select(
+                names, select(*source).where(id_in(MenuScheduleModel, ids))
+            )
+        )
+        db.session.execute(
+            delete(MenuScheduleModel).where(id_in(MenuScheduleModel, ids))
+        )
+        db.session.commit()
+        moved += len(ids)
+        if len(ids) < batch_size:
+            break
+    return moved
@@ -0,0 +1,27 @@
+"""JSON merge-patch (RFC 7396) validation for flat text resources."""
+
+MERGE_PATCH_MIMETYPE = "application/merge-patch+json"
+
+
+class MergePatchError(ValueError):
+    """Raised when a merge patch cannot be applied to the resource."""
+
+
+def parse_merge_patch(patch, fields):
+    """Check ``patch`` against the text ``fields`` a resource exposes.
+
+    The content resources are flat objects of NOT NULL text columns, so a
+    member must name one of ``fields`` and carry a string: ``null`` would
+    remove the member, which these columns cannot represent.
+    """
+    if not isinstance(patch, dict):
+        raise MergePatchError("A merge patch must be a JSON object")
+
+    for name, value in patch.items():
+        if name not in fields:
+            raise MergePatchError(f"Unknown field '{name}'")
+        if value is None:
+            raise MergePatchError(f"Field '{name}' cannot be removed")
+        if not isinstance(value, str):
+            raise MergePatchError(f"Field '{name}' must be a string")
+    return patch
@@ -0,0 +1,106 @@
+"""Transactional email through the ``mail_outbox`` table.
+
+Request handlers only ``enqueue`` a message, which joins their transaction and
+costs no SMTP round trip. ``mail_sender.py`` calls ``send_due`` in a loop: each
+call sends a batch of due messages over a single SMTP connection and pushes
+failed ones back with exponential backoff.
+"""
+
+import logging
+from datetime import timedelta
+from smtplib import SMTPException
+
+from flask_mail import Message
+
+from application import db, mail
+from config.environment import (
+    MAIL_BATCH_SIZE,
+    MAIL_MAX_ATTEMPTS,
+    MAIL_RETRY_BASE_SECONDS,
+)
+from models.mixins import utcnow
+from models.outbox_model import OutboxModel
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(sender, recipient, subject, body):
+    """Queue an email; it is sent once the caller's transaction commits."""
+    message = OutboxModel(
+        sender=sender, recipient=recipient, subject=subject, body=body
+    )
+    db.session.add(message)
+    return message
+
+
+def retry_delay(attempts):
+    """Wait before the next try of a message that has failed ``attempts`` times."""
+    return timedelta(seconds=MAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def due_messages(limit=MAIL_BATCH_SIZE):
+    """Claim up to ``limit`` unsent messages whose next attempt is due.
+
+    Rows locked by another sender are skipped, so several senders can drain
+    the outbox side by side.
+    """
+    return (
+        db.session.query(OutboxModel)
+        .filter(
+            OutboxModel.sent_at.is_(None),
+            OutboxModel.next_attempt_at <= utcnow(),
+            OutboxModel.attempts < MAIL_MAX_ATTEMPTS,
+        )
+        .order_by(OutboxModel.next_attempt_at, OutboxModel.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+
+def _failed(message, error):
+    message.attempts += 1
+    message.last_error = str(error)
+    message.next_attempt_at = utcnow() + retry_delay(message.attempts)
+    if message.attempts >= MAIL_MAX_ATTEMPTS:
+        logger.error(
+            "Giving up on email %s to %s: %s", message.id, message.recipient, error
+        )
+
+
+def send_due(limit=MAIL_BATCH_SIZE):
+    """Send one batch of due messages over one SMTP connection.
+
+    Returns the number of messages claimed, so the caller knows whether more
+    are waiting.
+    """
+    messages = due_messages(limit)
+    if not messages:
+        db.session.rollback()
+        return 0
+
+    try:
+        with mail.connect() as connection:
+            for message in messages:
+                try:
+                    connection.send(
+                        Message(
+                            subject=message.subject,
+                            sender=message.sender,
+                            recipients=[message.recipient],
+                            body=message.body,
+                        )
+                    )
+                    message.sent_at = utcnow()
+                except SMTPException as e:
+                    _failed(message, e)
+    except (SMTPException, OSError) as e:
+        # Connecting or logging in failed: the unsent rest of the batch waits.
+        for message in messages:
+            if message.sent_at is None:
+                _failed(message, e)
+
+    db.session.commit()
+    sent = sum(message.sent_at is not None for message in messages)
+    logger.info("Sent %s of %s queued emails", sent, len(messages))
+    return len(messages)
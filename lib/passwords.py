@@ -0,0 +1,88 @@
+"""Password hashing on a bounded bcrypt pool.
+
+bcrypt releases the GIL, so hashing on a small dedicated pool keeps the other
+request threads of a worker serving while logins are verified. The pool's
+backlog is capped: past ``BCRYPT_MAX_PENDING`` a request fails fast with
+``HasherBusy`` (503) instead of waiting until the worker times out.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from application import bcrypt
+from config.environment import (
+    BCRYPT_LOG_ROUNDS,
+    BCRYPT_MAX_PENDING,
+    BCRYPT_TARGET_MS,
+    BCRYPT_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+class HasherBusy(RuntimeError):
+    """Raised when the hashing pool already holds its maximum backlog."""
+
+
+def calibrate_rounds(target_ms=BCRYPT_TARGET_MS):
+    """Highest bcrypt cost that hashes within ``target_ms`` on this machine."""
+    rounds = MIN_ROUNDS
+    while rounds < MAX_ROUNDS:
+        start = time.perf_counter()
+        bcrypt.generate_password_hash("calibration", rounds)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        # Each extra round doubles the cost.
+        if elapsed_ms * 2 > target_ms:
+            break
+        rounds += 1
+    return rounds
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a bounded thread pool."""
+
+    def __init__(self, rounds, workers=BCRYPT_WORKERS, max_pending=BCRYPT_MAX_PENDING):
+        self.rounds = rounds
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="bcrypt"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy("Too many password checks in progress")
+        try:
+            return self._pool.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, plaintext):
+        """bcrypt hash of ``plaintext`` at the configured cost."""
+        return self._run(bcrypt.generate_password_hash, plaintext, self.rounds).decode(
+            "utf-8"
+        )
+
+    def check(self, password_hash, plaintext):
+        """Whether ``plaintext`` matches ``password_hash``."""
+        return self._run(bcrypt.check_password_hash, password_hash, plaintext)
+
+    def needs_rehash(self, password_hash):
+        """Whether ``password_hash`` was made at a cost other than the target."""
+        try:
+            return int(password_hash.split("$")[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
+
+
+if BCRYPT_LOG_ROUNDS == "auto":
+    _rounds = calibrate_rounds()
+    logger.info("Calibrated bcrypt cost to %s rounds", _rounds)
+else:
+    _rounds = int(BCRYPT_LOG_ROUNDS)
+
+hasher = PasswordHasher(_rounds)
@@ -0,0 +1,97 @@
+"""Per-worker cache of the users behind authenticated requests.
+
+Protected routes only need a user's id and role, so those are kept in a
+small in-process LRU for ``PRINCIPAL_CACHE_TTL`` seconds instead of being
+loaded on every request. Handlers that change a user call ``forget_principal``;
+other workers pick the change up when their entry expires.
+
+In stateless mode the principal is read from the token's claims instead and
+only checked against the revocation set.
+"""
+
+from collections import namedtuple
+
+import jwt
+
+from application import db
+from config.environment import PRINCIPAL_CACHE_TTL
+from lib.cache_backends import LocalLRUBackend
+from lib.revocations import revocations
+from models.users_model import UserModel
+
+Principal = namedtuple("Principal", ("id", "role", "username", "token_version"))
+
+_principals = LocalLRUBackend(max_entries=4096)
+
+
+def token_version(payload):
+    """A token's ``ver`` claim; tokens issued without one count as version 0.
+
+    Raises ``jwt.InvalidTokenError`` when the claim is not an integer.
+    """
+    try:
+        return int(payload.get("ver", 0))
+    except (TypeError, ValueError) as e:
+        raise jwt.InvalidTokenError("Malformed 'ver' claim") from e
+
+
+def load_principal(user_id, version=None):
+    """The principal for ``user_id``, or None when there is no such user.
+
+    A token ``version`` newer than the cached principal's means the user's
+    credentials changed since it was cached, so the principal is reloaded.
+    """
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+    principal = _principals.get(str(user_id))
+    if principal is None or (version is not None and version > principal.token_version):
+        row = (
+            db.session.query(*[getattr(UserModel, name) for name in Principal._fields])
+            .filter(UserModel.id == user_id)
+            .first()
+        )
+        if row is None:
+            return None
+        principal = Principal(*row)
+        _principals.set(str(user_id), principal, PRINCIPAL_CACHE_TTL)
+    return principal
+
+
+def is_current(principal, version):
+    """Whether a token issued at ``version`` is still valid for ``principal``.
+
+    The cached principal can lag behind another worker's change for
+    ``PRINCIPAL_CACHE_TTL``; the revocation set closes that gap within
+    ``REVOCATION_SYNC_SECONDS``.
+    """
+    if version < principal.token_version:
+        return False
+    return not revocations.is_revoked(principal.id, version)
+
+
+def forget_principal(*user_ids):
+    """Drop cached principals so the next request reloads them."""
+    _principals.delete(*(str(user_id) for user_id in user_ids))
+
+
+def principal_from_token(payload):
+    """The principal carried by a token's claims, or None when it was revoked.
+
+    Raises ``jwt.InvalidTokenError`` for tokens issued without the claims.
+    """
+    try:
+        principal = Principal(
+            int(payload["sub"]),
+            payload["role"],
+            payload.get("username"),
+            int(payload["ver"]),
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise jwt.InvalidTokenError("Token lacks the stateless claims") from e
+
+    if revocations.is_revoked(principal.id, principal.token_version):
+        return None
+    return principal
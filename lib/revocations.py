@@ -0,0 +1,119 @@
+"""Revocation of issued tokens.
+
+Every token carries its user's ``token_version``. Changing a user's role or
+password, or deleting the user, records the first version still valid in the
+``token_revocations`` table. Each worker keeps the table's live rows in
+memory and re-reads them every ``REVOCATION_SYNC_SECONDS``, so checking a
+token costs no query in the common case. Stateless mode relies on the set
+alone; the default mode also uses it to catch changes made through other
+workers before their principal cache expires.
+
+Tokens expire after ``TOKEN_LIFETIME``; older revocations can no longer match
+a valid token and are pruned, which keeps the table and the set small.
+"""
+
+import threading
+import time
+from datetime import timedelta
+
+from sqlalchemy import event, func, insert
+from sqlalchemy.orm import Session
+
+from application import db
+from config.environment import REVOCATION_SYNC_SECONDS
+from models.mixins import utcnow
+from models.revocation_model import RevocationModel
+
+TOKEN_LIFETIME = timedelta(days=1)
+
+# Minimum version recorded for deleted users: no token of theirs is valid.
+REVOKE_ALL = 2**31 - 1
+
+# Session.info key of revocations waiting for their transaction to commit.
+_PENDING = "pending_revocations"
+
+
+class RevocationSet:
+    """Exact in-memory map of user id to the oldest token version still valid."""
+
+    def __init__(self, sync_seconds=REVOCATION_SYNC_SECONDS):
+        self.sync_seconds = sync_seconds
+        self._lock = threading.Lock()
+        self._min_versions = {}
+        self._synced_at = None
+
+    def is_revoked(self, user_id, version):
+        """Whether a token of ``user_id`` issued at ``version`` was revoked."""
+        now = time.monotonic()
+        if self._synced_at is None or now - self._synced_at >= self.sync_seconds:
+            self.sync()
+        return version < self._min_versions.get(user_id, 0)
+
+    def sync(self):
+        """Reload the revocations that can still match an unexpired token."""
+        rows = (
+            db.session.query(
+                RevocationModel.user_id, func.max(RevocationModel.min_version)
+            )
+            .filter(RevocationModel.created_at > utcnow() - TOKEN_LIFETIME)
+            .group_by(RevocationModel.user_id)
+            .all()
+        )
+        with self._lock:
+            self._min_versions = dict(rows)
+            self._synced_at = time.monotonic()
+
+    def revoke(self, user_id, min_version):
+        """Revoke tokens of ``user_id`` older than ``min_version``.
+
+        The row joins the caller's transaction. Once it commits, this worker
+        applies it at once and the others on their next sync; a rollback
+        drops it.
+        """
+        self.revoke_many([user_id], min_version)
+
+    def revoke_many(self, user_ids, min_version):
+        """Revoke tokens of every user in ``user_ids`` older than ``min_version``.
+
+        Prunes expired rows once and records all users with one multi-row
+        INSERT, in the caller's transaction like ``revoke``.
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        db.session.query(RevocationModel).filter(
+            RevocationModel.created_at <= utcnow() - TOKEN_LIFETIME
+        ).delete(synchronize_session=False)
+        now = utcnow()
+        db.session.execute(
+            insert(RevocationModel).values(
+                [
+                    {"user_id": user_id, "min_version": min_version, "created_at": now}
+                    for user_id in user_ids
+                ]
+            )
+        )
+        db.session.info.setdefault(_PENDING, []).extend(
+            (user_id, min_version) for user_id in user_ids
+        )
+
+    def apply(self, user_id, min_version):
+        """Record a committed revocation in this worker's set."""
+        with self._lock:
+            self._min_versions[user_id] = max(
+                min_version, self._min_versions.get(user_id, 0)
+            )
+
+
+revocations = RevocationSet()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session):
+    for user_id, min_version in session.info.pop(_PENDING, ()):
+        revocations.apply(user_id, min_version)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back(session):
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,115 @@
+"""Wake the menu scheduler as soon as an update is scheduled.
+
+On Postgres the web process sends ``NOTIFY menu_schedule`` inside the
+transaction that stores the schedule, and the scheduler LISTENs on a
+dedicated connection; the notification is only delivered once the schedule
+is committed. Other databases (local SQLite) fall back to a UDP datagram on
+localhost, which only reaches a scheduler running on the same machine.
+Several workers on one machine share the port with ``SO_REUSEPORT``, and each
+datagram wakes one of them; the others pick the update up at their next
+resync. Where the port cannot be shared, a worker runs without wakeups.
+
+The payload is the due time itself, so the scheduler can put it on its heap
+without querying the database.
+"""
+
+import logging
+import select
+import socket
+import time
+from datetime import datetime
+
+from application import db
+from config.environment import SCHEDULER_WAKE_PORT
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_CHANNEL = "menu_schedule"
+
+
+def _is_postgres():
+    return db.engine.dialect.name == "postgresql"
+
+
+def notify_scheduled(due_at):
+    """Tell the scheduler an update is due at ``due_at`` (naive BST).
+
+    Call before committing: on Postgres the notification joins the
+    transaction and is dropped if it rolls back.
+    """
+    payload = due_at.isoformat()
+    if _is_postgres():
+        db.session.execute(
+            db.text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": SCHEDULE_CHANNEL, "payload": payload},
+        )
+        return
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.sendto(payload.encode("ascii"), ("127.0.0.1", SCHEDULER_WAKE_PORT))
+
+
+class ScheduleListener:
+    """The scheduler's end: waits for due times announced by ``notify_scheduled``."""
+
+    def __init__(self):
+        if _is_postgres():
+            self._connection = db.engine.raw_connection()
+            driver_connection = self._connection.driver_connection
+            driver_connection.autocommit = True
+            with driver_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {SCHEDULE_CHANNEL}")
+            self._source = driver_connection
+        else:
+            self._connection = None
+            self._source = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            if hasattr(socket, "SO_REUSEPORT"):
+                self._source.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            try:
+                self._source.bind(("127.0.0.1", SCHEDULER_WAKE_PORT))
+            except OSError as e:
+                logger.warning(
+                    "Schedule wakeups disabled, cannot listen on port %s: %s",
+                    SCHEDULER_WAKE_PORT,
+                    e,
+                )
+                self._source.close()
+                self._source = None
+            else:
+                self._source.setblocking(False)
+
+    def wait(self, timeout):
+        """Block up to ``timeout`` seconds; return the due times received."""
+        if self._source is None:
+            time.sleep(max(timeout, 0))
+            return []
+        ready, _, _ = select.select([self._source], [], [], max(timeout, 0))
+        if not ready:
+            return []
+
+        if self._connection is not None:
+            self._source.poll()
+            payloads = [notify.payload for notify in self._source.notifies]
+            self._source.notifies.clear()
+        else:
+            payloads = []
+            while True:
+                try:
+                    payloads.append(self._source.recv(64).decode("ascii"))
+                except BlockingIOError:
+                    break
+
+        due_times = []
+        for payload in payloads:
+            try:
+                due_times.append(datetime.fromisoformat(payload))
+            except ValueError:
+                logger.warning("Ignoring malformed schedule notification %r", payload)
+        return due_times
+
+    def close(self):
+        if self._connection is not None:
+            # Never hand a LISTENing autocommit connection, or a dead one, back
+            # to the pool.
+            self._connection.invalidate()
+        elif self._source is not None:
+            self._source.close()
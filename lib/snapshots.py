@@ -0,0 +1,126 @@
+"""Publishes the public JSON of every read endpoint as static files.
+
+Each publish renders into a fresh ``releases/<id>`` directory together with a
+manifest of content hashes, then atomically repoints the ``current`` symlink,
+so a static host or CDN origin always sees one complete release.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+
+from flask import current_app
+
+from application import db
+from config.environment import SNAPSHOT_DIR, SNAPSHOT_KEEP
+from controllers.carousels_controller import load_carousels
+from controllers.content_controller import load_bundle, load_content, load_section
+from controllers.grid_controller import load_grid
+from controllers.menus_controller import load_menus
+from lib.cache import content_cache
+from models import ContentModel, CONTENT_SECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+def render_snapshot():
+    """Map each public path (relative to /api) to its JSON bytes."""
+    files = {"content.json": load_content()}
+    for (content_id,) in db.session.query(ContentModel.id).all():
+        prefix = f"content/{content_id}"
+        files[f"{prefix}/bundle.json"] = load_bundle(content_id)
+        for section in CONTENT_SECTIONS:
+            files[f"{prefix}/{section}.json"] = load_section(content_id, section)
+        files[f"{prefix}/menus.json"] = load_menus(content_id)
+        files[f"{prefix}/carousel.json"] = load_carousels(content_id)
+        files[f"{prefix}/grid.json"] = load_grid(content_id)
+
+    return {
+        path: current_app.json.response(data).get_data() for path, data in files.items()
+    }
+
+
+def publish_snapshot(directory=SNAPSHOT_DIR, keep=SNAPSHOT_KEEP):
+    """Render every endpoint into a new release and make it current.
+
+    Returns the release id, or None when nothing changed since the current
+    release.
+    """
+    os.makedirs(os.path.join(directory, "releases"), exist_ok=True)
+    with open(os.path.join(directory, ".lock"), "w") as lock:
+        # Render under the lock so the last publisher always sees the latest
+        # committed data, whichever worker it runs in.
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        files = render_snapshot()
+        hashes = {
+            path: hashlib.sha256(body).hexdigest() for path, body in files.items()
+        }
+        digest = hashlib.sha256(
+            json.dumps(hashes, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+        current = os.path.join(directory, "current")
+        manifest_path = os.path.join(current, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as manifest_file:
+                if json.load(manifest_file)["digest"] == digest:
+                    return None
+
+        release = f"{int(time.time() * 1000)}-{digest[:12]}"
+        release_dir = os.path.join(directory, "releases", release)
+        for path, body in files.items():
+            target = os.path.join(release_dir, path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as target_file:
+                target_file.write(body)
+
+        manifest = {
+            "release": release,
+            "digest": digest,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "files": {
+                path: {"sha256": hashes[path], "bytes": len(body)}
+                for path, body in files.items()
+            },
+        }
+        with open(os.path.join(release_dir, "manifest.json"), "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+
+        # Atomic pointer swap: build the new link aside, then rename over it.
+        pointer = os.path.join(directory, f"current.{os.getpid()}")
+        os.symlink(os.path.join("releases", release), pointer)
+        os.replace(pointer, current)
+
+        prune_releases(directory, keep)
+        return release
+
+
+def prune_releases(directory, keep):
+    """Delete all but the ``keep`` newest releases."""
+    releases_dir = os.path.join(directory, "releases")
+    live = os.path.basename(os.readlink(os.path.join(directory, "current")))
+    releases = sorted(
+        os.listdir(releases_dir), key=lambda name: int(name.split("-")[0])
+    )
+    for release in releases[:-keep]:
+        if release != live:
+            shutil.rmtree(os.path.join(releases_dir, release), ignore_errors=True)
+
+
+def publish_after_change():
+    """``content_cache`` listener: publishing must never fail the write."""
+    try:
+        release = publish_snapshot()
+        if release:
+            logger.info("Published snapshot release %s", release)
+    except Exception as e:
+        logger.error("Snapshot publish failed: %s", e)
+
+
+if SNAPSHOT_DIR:
+    content_cache.add_listener(publish_after_change)
@@ -0,0 +1,57 @@
+"""Streamed JSON responses over ``yield_per`` queries.
+
+Rows are fetched from the database cursor in batches and written to the
+client as they are serialized, so a listing costs the same memory however
+many rows it returns.
+"""
+
+import json
+
+from flask import Response, request, stream_with_context
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# Rows fetched from the cursor per round trip.
+STREAM_BATCH_SIZE = 500
+
+
+def wants_ndjson():
+    """Whether the client asked for newline-delimited JSON."""
+    if request.args.get("format") == "ndjson":
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def _json_array(rows, dump):
+    yield "["
+    for index, row in enumerate(rows):
+        yield ("," if index else "") + json.dumps(dump(row))
+    yield "]"
+
+
+def _ndjson(rows, dump):
+    for row in rows:
+        yield json.dumps(dump(row)) + "\n"
+
+
+def render_rows(rows, dump, ndjson=False):
+    """Already loaded ``rows`` as one JSON array or NDJSON body."""
+    if ndjson:
+        return Response("".join(_ndjson(rows, dump)), mimetype=NDJSON_MIMETYPE)
+    return Response("".join(_json_array(rows, dump)), mimetype="application/json")
+
+
+def stream_rows(query, dump, ndjson=False):
+    """Stream ``query``'s rows through ``dump`` as a JSON array or as NDJSON.
+
+    The query runs with ``yield_per`` inside the request context, which stays
+    open until the last row has been written.
+    """
+    rows = query.yield_per(STREAM_BATCH_SIZE)
+    if ndjson:
+        return Response(
+            stream_with_context(_ndjson(rows, dump)), mimetype=NDJSON_MIMETYPE
+        )
+    return Response(
+        stream_with_context(_json_array(rows, dump)), mimetype="application/json"
+    )
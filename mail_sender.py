@@ -0,0 +1,44 @@
+"""Background sender draining the mail_outbox table.
+
+Run next to the web process (see the Procfile). To try it locally against an
+SMTP sink:
+
+    python -m aiosmtpd -n -l localhost:8025
+    MAIL_SERVER=localhost MAIL_PORT=8025 MAIL_USE_TLS=false python mail_sender.py
+"""
+
+import logging
+import time
+
+from application import app, db
+from config.environment import MAIL_BATCH_SIZE, MAIL_POLL_SECONDS
+from lib.outbox import send_due
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def run_sender():
+    """Send queued email, polling every MAIL_POLL_SECONDS while idle"""
+    logger.info("Starting mail sender...")
+
+    while True:
+        try:
+            with app.app_context():
+                claimed = send_due()
+            # A full batch means more may be due right away.
+            if claimed < MAIL_BATCH_SIZE:
+                time.sleep(MAIL_POLL_SECONDS)
+        except KeyboardInterrupt:
+            logger.info("Mail sender stopped by user")
+            break
+        except Exception as e:
+            with app.app_context():
+                db.session.rollback()
+            logger.error(f"Unexpected error in mail sender: {str(e)}")
+            time.sleep(MAIL_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    run_sender()
@@ -6,47 +6,74 @@ from http import HTTPStatus
 import jwt
 from flask import request, g
 
-from application import db
-from config.environment import SECRET
-from models.users_model import UserModel
+from config.environment import AUTH_STATELESS, SECRET
+from lib.principals import (
+    is_current,
+    load_principal,
+    principal_from_token,
+    token_version,
+)
+
+
+def _authenticate():
+    """Resolve the request's bearer token into ``g.current_user``.
+
+    Returns None on success, otherwise the error response to send. The user
+    comes from the worker's principal cache, so most requests skip the DB;
+    in stateless mode it comes from the token itself. Either way, tokens older
+    than the user's current version are rejected.
+    """
+    raw_token = request.headers.get("Authorization")
+    if not raw_token:
+        return {"message": "Not authorized"}, HTTPStatus.UNAUTHORIZED
+
+    token = raw_token.replace("Bearer ", "")
+    try:
+        payload = jwt.decode(token, SECRET, algorithms=["HS256"])
+        user_id = payload.get("sub")
+        if not user_id or not isinstance(user_id, str):
+            return {
+                "message": "Invalid token, 'sub' field missing or malformed"
+            }, HTTPStatus.UNAUTHORIZED
+
+        if AUTH_STATELESS:
+            user = principal_from_token(payload)
+            if not user:
+                return {"message": "Token has been revoked"}, HTTPStatus.UNAUTHORIZED
+        else:
+            version = token_version(payload)
+            user = load_principal(user_id, version)
+            if not user:
+                return {"message": "User not found"}, HTTPStatus.UNAUTHORIZED
+            # Password and role changes bump the version, signing out older tokens.
+            if not is_current(user, version):
+                return {"message": "Token has been revoked"}, HTTPStatus.UNAUTHORIZED
 
+        g.current_user = user
+        return None
 
-def secure_route(route_function):
-    """Decorator to check if the user is authenticated."""
+    except jwt.ExpiredSignatureError:
+        return {"message": "Token is expired"}, HTTPStatus.UNAUTHORIZED
 
-    @wraps(route_function)
-    def wrapper(*args, **kwargs):
-        raw_token = request.headers.get("Authorization")
-        if not raw_token:
-            return {"message": "Not authorized"}, HTTPStatus.UNAUTHORIZED
-
-        token = raw_token.replace("Bearer ", "")
-        try:
-            payload = jwt.decode(token, SECRET, algorithms=["HS256"])
-            user_id = payload.get("sub")
-            if not user_id or not isinstance(user_id, str):
-                return {
-                    "message": "Invalid token, 'sub' field missing or malformed"
-                }, HTTPStatus.UNAUTHORIZED
-
-            user = db.session.query(UserModel).get(user_id)
-            if not user:
-                return {"message": "User not found"}, HTTPStatus.UNAUTHORIZED
+    except jwt.DecodeError:
+        return {"message": "Invalid token"}, HTTPStatus.UNAUTHORIZED
 
-            g.current_user = user
-            return route_function(*args, **kwargs)
+    except jwt.InvalidTokenError:
+        return {"message": "Invalid token"}, HTTPStatus.UNAUTHORIZED
 
-        except jwt.ExpiredSignatureError:
-            return {"message": "Token is expired"}, HTTPStatus.UNAUTHORIZED
+    except jwt.PyJWTError:
+        return {"message": "Not authorized"}, HTTPStatus.UNAUTHORIZED
 
-        except jwt.DecodeError:
-            return {"message": "Invalid token"}, HTTPStatus.UNAUTHORIZED
 
-        except jwt.InvalidTokenError:
-            return {"message": "Invalid token"}, HTTPStatus.UNAUTHORIZED
+def secure_route(route_function):
+    """Decorator to check if the user is authenticated."""
 
-        except jwt.PyJWTError:
-            return {"message": "Not authorized"}, HTTPStatus.UNAUTHORIZED
+    @wraps(route_function)
+    def wrapper(*args, **kwargs):
+        error = _authenticate()
+        if error:
+            return error
+        return route_function(*args, **kwargs)
 
     return wrapper
 
@@ -57,44 +84,17 @@ def role_required(*allowed_roles):
     def decorator(route_function):
         @wraps(route_function)
         def wrapper(*args, **kwargs):
-            raw_token = request.headers.get("Authorization")
-            if not raw_token:
-                return {"message": "Not authorized"}, HTTPStatus.UNAUTHORIZED
-
-            token = raw_token.replace("Bearer ", "")
-            try:
-                payload = jwt.decode(token, SECRET, algorithms=["HS256"])
-                user_id = payload.get("sub")
-                if not user_id or not isinstance(user_id, str):
-                    return {
-                        "message": "Invalid token, 'sub' field missing or malformed"
-                    }, HTTPStatus.UNAUTHORIZED
-
-                user = db.session.query(UserModel).get(user_id)
-                if not user:
-                    return {"message": "User not found"}, HTTPStatus.UNAUTHORIZED
-
-                g.current_user = user
+            error = _authenticate()
+            if error:
+                return error
 
-                # Role check — this is the key difference from secure_route
-                if g.current_user.role not in allowed_roles:
-                    return {
-                        "message": "Forbidden: insufficient permissions"
-                    }, HTTPStatus.FORBIDDEN
-
-                return route_function(*args, **kwargs)
-
-            except jwt.ExpiredSignatureError:
-                return {"message": "Token is expired"}, HTTPStatus.UNAUTHORIZED
-
-            except jwt.DecodeError:
-                return {"message": "Invalid token"}, HTTPStatus.UNAUTHORIZED
-
-            except jwt.InvalidTokenError:
-                return {"message": "Invalid token"}, HTTPStatus.UNAUTHORIZED
+            # Role check — this is the key difference from secure_route
+            if g.current_user.role not in allowed_roles:
+                return {
+                    "message": "Forbidden: insufficient permissions"
+                }, HTTPStatus.FORBIDDEN
 
-            except jwt.PyJWTError:
-                return {"message": "Not authorized"}, HTTPStatus.UNAUTHORIZED
+            return route_function(*args, **kwargs)
 
         return wrapper
 
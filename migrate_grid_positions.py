@@ -0,0 +1,47 @@
+"""
+Database migration script for sparse grid positions
+Run this on production to index grid tiles by (content_id, position) and
+respace existing positions so a tile can be moved by rewriting one row
+"""
+
+from application import app, db
+from lib.grid_order import POSITION_GAP
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrate_database():
+    """Index grid ordering and spread positions POSITION_GAP apart"""
+    with app.app_context():
+        try:
+            logger.info("Starting database migration...")
+
+            migration_sql = f"""
+            CREATE INDEX IF NOT EXISTS ix_grid_content_id_position
+            ON grid (content_id, position);
+            UPDATE grid SET position = ranked.position
+            FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY content_id ORDER BY position, id
+                ) * {POSITION_GAP} AS position
+                FROM grid
+            ) AS ranked
+            WHERE grid.id = ranked.id;
+            """
+            db.session.execute(db.text(migration_sql))
+            db.session.commit()
+
+            logger.info("Database migration completed successfully!")
+            logger.info("Grid positions are now %s apart", POSITION_GAP)
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Migration failed: {str(e)}")
+            raise
+
+
+if __name__ == "__main__":
+    migrate_database()
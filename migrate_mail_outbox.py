@@ -0,0 +1,49 @@
+"""
+Database migration script to create the mail_outbox table
+Run this on production before deploying the mail sender
+"""
+
+from application import app, db
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrate_database():
+    """Create mail_outbox and its index on pending messages"""
+    with app.app_context():
+        try:
+            logger.info("Starting database migration...")
+
+            migration_sql = """
+            CREATE TABLE IF NOT EXISTS mail_outbox (
+                id SERIAL PRIMARY KEY,
+                sender VARCHAR(255) NOT NULL,
+                recipient VARCHAR(255) NOT NULL,
+                subject VARCHAR(255) NOT NULL,
+                body TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+                last_error TEXT,
+                created_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+                sent_at TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS ix_mail_outbox_pending
+            ON mail_outbox (next_attempt_at) WHERE sent_at IS NULL;
+            """
+            db.session.execute(db.text(migration_sql))
+            db.session.commit()
+
+            logger.info("Database migration completed successfully!")
+            logger.info("Created mail_outbox")
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Migration failed: {str(e)}")
+            raise
+
+
+if __name__ == "__main__":
+    migrate_database()
@@ -0,0 +1,75 @@
+"""
+Database migration script to create the menu_schedule tables
+Run this on production before deploying the multi-version menu scheduler
+(it is safe to run again, e.g. to add the pending-rows index).
+Pending updates still held in the menus.scheduled_* columns are moved into
+menu_schedule; the old columns are left in place and are no longer read.
+"""
+
+from application import app, db
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrate_database():
+    """Create menu_schedule and its archive, then move legacy pending updates"""
+    with app.app_context():
+        try:
+            logger.info("Starting database migration...")
+
+            migration_sql = """
+            CREATE TABLE IF NOT EXISTS menu_schedule (
+                id SERIAL PRIMARY KEY,
+                menu_id INTEGER NOT NULL REFERENCES menus (id) ON DELETE CASCADE,
+                menus_text TEXT,
+                menus_url TEXT,
+                due_at TIMESTAMP NOT NULL,
+                applied BOOLEAN NOT NULL DEFAULT FALSE,
+                applied_at TIMESTAMP,
+                created_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+            );
+            CREATE INDEX IF NOT EXISTS ix_menu_schedule_applied_due_at
+            ON menu_schedule (applied, due_at);
+            CREATE INDEX IF NOT EXISTS ix_menu_schedule_pending_due_at
+            ON menu_schedule (due_at) WHERE NOT applied;
+
+            CREATE TABLE IF NOT EXISTS menu_schedule_archive (
+                id SERIAL PRIMARY KEY,
+                schedule_id INTEGER NOT NULL,
+                menu_id INTEGER NOT NULL,
+                menus_text TEXT,
+                menus_url TEXT,
+                due_at TIMESTAMP NOT NULL,
+                applied_at TIMESTAMP,
+                created_at TIMESTAMP NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_menu_schedule_archive_schedule_id
+            ON menu_schedule_archive (schedule_id);
+
+            INSERT INTO menu_schedule (menu_id, menus_text, menus_url, due_at)
+            SELECT id, scheduled_text, scheduled_url, scheduled_at
+            FROM menus
+            WHERE applied = FALSE AND scheduled_at IS NOT NULL;
+
+            UPDATE menus
+            SET scheduled_text = NULL, scheduled_url = NULL,
+                scheduled_at = NULL, applied = TRUE
+            WHERE applied = FALSE AND scheduled_at IS NOT NULL;
+            """
+            db.session.execute(db.text(migration_sql))
+            db.session.commit()
+
+            logger.info("Database migration completed successfully!")
+            logger.info("Created menu_schedule and menu_schedule_archive")
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Migration failed: {str(e)}")
+            raise
+
+
+if __name__ == "__main__":
+    migrate_database()
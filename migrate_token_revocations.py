@@ -0,0 +1,43 @@
+"""
+Database migration script to create the token_revocations table
+Run this on production before enabling AUTH_STATELESS
+"""
+
+from application import app, db
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrate_database():
+    """Create token_revocations and its created_at index"""
+    with app.app_context():
+        try:
+            logger.info("Starting database migration...")
+
+            migration_sql = """
+            CREATE TABLE IF NOT EXISTS token_revocations (
+                id SERIAL PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                min_version INTEGER NOT NULL,
+                created_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+            );
+            CREATE INDEX IF NOT EXISTS ix_token_revocations_created_at
+            ON token_revocations (created_at);
+            """
+            db.session.execute(db.text(migration_sql))
+            db.session.commit()
+
+            logger.info("Database migration completed successfully!")
+            logger.info("Created token_revocations")
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Migration failed: {str(e)}")
+            raise
+
+
+if __name__ == "__main__":
+    migrate_database()
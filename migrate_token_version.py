@@ -0,0 +1,37 @@
+"""
+Database migration script to add the users.token_version column
+Run this on production before deploying the principal cache
+"""
+
+from application import app, db
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrate_database():
+    """Add token_version to the users table"""
+    with app.app_context():
+        try:
+            logger.info("Starting database migration...")
+
+            migration_sql = """
+            ALTER TABLE users
+            ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
+            """
+            db.session.execute(db.text(migration_sql))
+            db.session.commit()
+
+            logger.info("Database migration completed successfully!")
+            logger.info("Added token_version to users")
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Migration failed: {str(e)}")
+            raise
+
+
+if __name__ == "__main__":
+    migrate_database()
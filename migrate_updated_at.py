@@ -0,0 +1,44 @@
+"""
+Database migration script to add updated_at tracking columns
+Run this on production to add the indexed updated_at column to every table
+"""
+
+from application import app, db
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TABLES = ["content", "menus", "carousel", "grid", "users"]
+
+
+def migrate_database():
+    """Add an indexed updated_at column to each table"""
+    with app.app_context():
+        try:
+            logger.info("Starting database migration...")
+
+            for table in TABLES:
+                migration_sql = f"""
+                ALTER TABLE {table}
+                ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL
+                DEFAULT (now() AT TIME ZONE 'utc');
+                CREATE INDEX IF NOT EXISTS ix_{table}_updated_at
+                ON {table} (updated_at);
+                """
+                db.session.execute(db.text(migration_sql))
+
+            db.session.commit()
+
+            logger.info("Database migration completed successfully!")
+            logger.info("Added updated_at to: %s", ", ".join(TABLES))
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Migration failed: {str(e)}")
+            raise
+
+
+if __name__ == "__main__":
+    migrate_database()
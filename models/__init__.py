@@ -1,8 +1,15 @@
 from application import db
-from models.content_model import ContentModel
+from models.content_model import ContentModel, CONTENT_SECTIONS
 from models.menus_model import MenusModel
 from models.carousel_model import CarouselModel
 from models.grid_model import GridModel
+from models import content_changes  # noqa: F401  registers the content touch hooks
 
 # This ensures all models are loaded before relationships are established
-__all__ = ["ContentModel", "MenusModel", "CarouselModel", "GridModel"]
+__all__ = [
+    "ContentModel",
+    "CONTENT_SECTIONS",
+    "MenusModel",
+    "CarouselModel",
+    "GridModel",
+]
@@ -1,7 +1,8 @@
 from application import db
+from models.mixins import TimestampMixin
 
 
-class CarouselModel(db.Model):
+class CarouselModel(db.Model, TimestampMixin):
     __tablename__ = "carousel"  # The name of the table in the database
     id = db.Column(db.Integer, primary_key=True, unique=True)
     carousel_url = db.Column(db.Text, nullable=False)
@@ -0,0 +1,80 @@
+"""Keep a content's ``updated_at`` current when its carousels, menus or grid change.
+
+Conditional GETs compare If-Modified-Since with ``max(updated_at)`` over the
+rows behind a response. Deleting a child row cannot raise that maximum, so
+every write to a child table, deletes included, also touches its content
+row; endpoints list that row among their sources and see the change.
+
+Both paths that write child rows are covered: the ORM unit of work
+(``after_flush``) and ORM-enabled INSERT/UPDATE/DELETE statements such as
+those issued by ``lib.bulk`` (``do_orm_execute``). The touch joins the
+writer's transaction.
+"""
+
+from itertools import chain
+
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+
+from models.carousel_model import CarouselModel
+from models.content_model import ContentModel
+from models.grid_model import GridModel
+from models.menus_model import MenusModel
+from models.mixins import utcnow
+
+CONTENT_CHILDREN = (CarouselModel, GridModel, MenusModel)
+
+
+def touch_contents(connection, content_ids=None):
+    """Set ``updated_at`` of the ``content_ids`` rows (a set or a subquery).
+
+    ``None`` touches every content row.
+    """
+    statement = update(ContentModel.__table__).values(updated_at=utcnow())
+    if content_ids is not None:
+        statement = statement.where(ContentModel.__table__.c.id.in_(content_ids))
+    connection.execute(statement)
+
+
+@event.listens_for(Session, "after_flush")
+def _touch_after_flush(session, flush_context):
+    content_ids = set()
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(instance, CONTENT_CHILDREN):
+            continue
+        if instance in session.dirty and not session.is_modified(instance):
+            continue
+        # A row moved to another content changes both pages.
+        history = inspect(instance).attrs.content_id.history
+        content_ids.update(chain(history.deleted, [instance.content_id]))
+    content_ids.discard(None)
+    if content_ids:
+        touch_contents(session.connection(), content_ids)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _touch_before_statement(state):
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    mapper = state.bind_mapper
+    if mapper is None or not issubclass(mapper.class_, CONTENT_CHILDREN):
+        return
+
+    table = mapper.local_table
+    connection = state.session.connection()
+    if state.is_insert:
+        rows = state.parameters
+        rows = [rows] if isinstance(rows, dict) else rows or []
+        content_ids = {row.get("content_id") for row in rows}
+        if not content_ids or None in content_ids:
+            # Values set on the statement itself are not inspected.
+            content_ids = None
+        touch_contents(connection, content_ids)
+    elif state.statement.whereclause is None:
+        touch_contents(connection)
+    else:
+        # Touch before the statement runs, while deleted rows still match.
+        touch_contents(
+            connection,
+            select(table.c.content_id).where(state.statement.whereclause),
+        )
@@ -1,7 +1,65 @@
+from sqlalchemy.orm import joinedload, noload, selectinload, subqueryload
+
 from application import db
+from models.mixins import TimestampMixin
+
+# Relationship loaders selectable per query: collection endpoints use
+# "selectin" (one extra query per relationship, no cartesian product),
+# column-only endpoints use "none".
+LOADER_STRATEGIES = {
+    "joined": joinedload,
+    "selectin": selectinload,
+    "subquery": subqueryload,
+    "none": noload,
+}
+
+# Columns served and accepted by each /content/<id>/<section> endpoint.
+CONTENT_SECTIONS = {
+    "about": ("about_title", "about_text"),
+    "reservation": (
+        "reservation_title",
+        "reservation_text",
+        "reservation_line_one",
+        "reservation_line_two",
+        "breakfast_timing_day_one",
+        "breakfast_timing_hours_one",
+        "breakfast_timing_day_two",
+        "breakfast_timing_hours_two",
+        "lunch_timing_day_one",
+        "lunch_timing_hours_one",
+        "lunch_timing_day_two",
+        "lunch_timing_hours_two",
+        "dinner_timing_day_one",
+        "dinner_timing_hours_one",
+        "dinner_timing_day_two",
+        "dinner_timing_hours_two",
+        "phone",
+        "email",
+    ),
+    "contact": (
+        "contact_title",
+        "phone",
+        "email",
+        "contact_adress_one",
+        "contact_adress_two",
+        "contact_opening_day_one",
+        "contact_opening_hours_one",
+        "contact_opening_day_two",
+        "contact_opening_hours_two",
+        "contact_opening_day_three",
+        "contact_opening_hours_three",
+        "map",
+    ),
+    "opening_hours": (
+        "breakfast_timing_day_one",
+        "breakfast_timing_hours_one",
+        "breakfast_timing_day_two",
+        "breakfast_timing_hours_two",
+    ),
+}
 
 
-class ContentModel(db.Model):
+class ContentModel(db.Model, TimestampMixin):
     __tablename__ = "content"
     id = db.Column(db.Integer, primary_key=True, unique=True)
     about_title = db.Column(db.Text, nullable=False)
@@ -34,9 +92,20 @@ class ContentModel(db.Model):
     contact_opening_day_three = db.Column(db.Text, nullable=False)
     contact_opening_hours_three = db.Column(db.Text, nullable=False)
     map = db.Column(db.Text, nullable=False)
-    carousels = db.relationship("CarouselModel", backref="content", lazy="joined")
-    menus = db.relationship("MenusModel", backref="content", lazy="joined")
-    grid = db.relationship("GridModel", backref="content", lazy="joined")
+    carousels = db.relationship("CarouselModel", backref="content")
+    menus = db.relationship("MenusModel", backref="content")
+    grid = db.relationship("GridModel", backref="content")
+
+    @classmethod
+    def section_columns(cls, section):
+        """Column attributes for a section declared in CONTENT_SECTIONS."""
+        return [getattr(cls, name) for name in CONTENT_SECTIONS[section]]
+
+    @classmethod
+    def load_children(cls, strategy="selectin"):
+        """Loader options for carousels, menus and grid using ``strategy``."""
+        loader = LOADER_STRATEGIES[strategy]
+        return [loader(cls.carousels), loader(cls.menus), loader(cls.grid)]
 
     def remove(self):
         db.session.delete(self)
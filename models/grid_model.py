@@ -1,8 +1,13 @@
 from application import db
+from models.mixins import TimestampMixin
 
 
-class GridModel(db.Model):
+class GridModel(db.Model, TimestampMixin):
     __tablename__ = "grid"  # The name of the table in the database
+    # Tiles are always read per content in position order.
+    __table_args__ = (
+        db.Index("ix_grid_content_id_position", "content_id", "position"),
+    )
     id = db.Column(db.Integer, primary_key=True, unique=True)
     grid_url = db.Column(db.Text, nullable=False)
     position = db.Column(db.Integer, nullable=False)
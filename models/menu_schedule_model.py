@@ -0,0 +1,45 @@
+"""Queued menu versions, and the archive applied versions are moved to."""
+from application import db
+from models.mixins import utcnow
+
+
+class MenuVersionMixin:
+    """Text and/or URL a menu switches to at ``due_at`` (naive BST)."""
+    menus_text = db.Column(db.Text, nullable=True)
+    menus_url = db.Column(db.Text, nullable=True)
+    due_at = db.Column(db.DateTime, nullable=False)
+    applied_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+
+
+class MenuScheduleModel(db.Model, MenuVersionMixin):
+    """A future version of a menu; a menu may have any number queued."""
+    __tablename__ = "menu_schedule"
+    # The scheduler's due query is a range scan over (applied=false, due_at);
+    # the partial index holds only pending rows, so it stays tiny.
+    __table_args__ = (
+        db.Index("ix_menu_schedule_applied_due_at", "applied", "due_at"),
+        db.Index(
+            "ix_menu_schedule_pending_due_at",
+            "due_at",
+            postgresql_where=db.text("NOT applied"),
+            sqlite_where=db.text("NOT applied"),
+        ),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    menu_id = db.Column(
+        db.Integer, db.ForeignKey("menus.id", ondelete="CASCADE"), nullable=False
+    )
+    applied = db.Column(db.Boolean, nullable=False, default=False)
+
+
+class MenuScheduleArchiveModel(db.Model, MenuVersionMixin):
+    """Applied versions moved out of ``menu_schedule`` to keep it small.
+
+    ``schedule_id`` is the version's id in ``menu_schedule``; it is not unique,
+    since SQLite may reuse the ids of deleted rows.
+    """
+    __tablename__ = "menu_schedule_archive"
+    id = db.Column(db.Integer, primary_key=True)
+    schedule_id = db.Column(db.Integer, nullable=False, index=True)
+    menu_id = db.Column(db.Integer, nullable=False)
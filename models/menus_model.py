@@ -1,7 +1,8 @@
 from application import db
+from models.mixins import TimestampMixin
 
 
-class MenusModel(db.Model):
+class MenusModel(db.Model, TimestampMixin):
     __tablename__ = "menus"  # The name of the table in the database
     id = db.Column(db.Integer, primary_key=True, unique=True)
     menus_type = db.Column(
@@ -10,12 +11,7 @@ class MenusModel(db.Model):
     menus_text = db.Column(db.Text, nullable=False)
     menus_url = db.Column(db.Text, nullable=False)
     content_id = db.Column(db.Integer, db.ForeignKey("content.id"), nullable=False)
-
-    # Scheduled update fields
-    scheduled_text = db.Column(db.Text, nullable=True)
-    scheduled_url = db.Column(db.Text, nullable=True)
-    scheduled_at = db.Column(db.DateTime, nullable=True)
-    applied = db.Column(db.Boolean, default=True)
+    # Scheduled versions live in menu_schedule (models/menu_schedule_model.py).
 
     def remove(self):
         db.session.delete(self)
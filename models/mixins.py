@@ -0,0 +1,16 @@
+from datetime import datetime, timezone
+
+from application import db
+
+
+def utcnow():
+    """Naive UTC timestamp, matching the DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class TimestampMixin:
+    """Adds an indexed ``updated_at`` kept current on every insert and update."""
+
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=utcnow, onupdate=utcnow, index=True
+    )
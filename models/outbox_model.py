@@ -0,0 +1,27 @@
+"""Outbox model queueing transactional email for the background sender."""
+from application import db
+from models.mixins import utcnow
+
+
+class OutboxModel(db.Model):
+    """One email waiting to be sent, or already sent at ``sent_at``."""
+    __tablename__ = "mail_outbox"
+    # The sender only ever looks for unsent messages that are due.
+    __table_args__ = (
+        db.Index(
+            "ix_mail_outbox_pending",
+            "next_attempt_at",
+            postgresql_where=db.text("sent_at IS NULL"),
+            sqlite_where=db.text("sent_at IS NULL"),
+        ),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    sender = db.Column(db.String(255), nullable=False)
+    recipient = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
@@ -0,0 +1,12 @@
+"""Revocation model recording which issued tokens are no longer valid."""
+from application import db
+from models.mixins import utcnow
+
+
+class RevocationModel(db.Model):
+    """Tokens of ``user_id`` older than ``min_version`` are revoked."""
+    __tablename__ = "token_revocations"
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    min_version = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow, index=True)
@@ -1,9 +1,11 @@
 """User model module defining the UserModel for authentication and user management."""
 from sqlalchemy.ext.hybrid import hybrid_property
-from application import db, bcrypt
+from application import db
+from lib.passwords import hasher
+from models.mixins import TimestampMixin
 
 
-class UserModel(db.Model):
+class UserModel(db.Model, TimestampMixin):
     """Represents a user with authentication and role management."""
     __tablename__ = "users"
     id = db.Column(db.Integer, primary_key=True, unique=True)
@@ -15,6 +17,8 @@ class UserModel(db.Model):
     password_confirmation = db.Column(db.Text, nullable=True)
     image = db.Column(db.Text, nullable=True)
     role = db.Column(db.String(20), nullable=False, default="user")
+    # Incremented whenever the user's credentials or role change.
+    token_version = db.Column(db.Integer, nullable=False, default=0)
     __table_args__ = (
         db.CheckConstraint(
             role.in_(["user", "admin", "superadmin"]), name="valid_roles"
@@ -27,12 +31,15 @@ class UserModel(db.Model):
 
     @password.setter
     def password(self, password_plaintext):
-        encoded_hashed_pw = bcrypt.generate_password_hash(password_plaintext)
-        self.password_hash = encoded_hashed_pw.decode("utf-8")
+        self.password_hash = hasher.hash(password_plaintext)
 
     def validate_password(self, password_plaintext):
         """Validate the password against the stored hash."""
-        return bcrypt.check_password_hash(self.password_hash, password_plaintext)
+        return hasher.check(self.password_hash, password_plaintext)
+
+    def needs_rehash(self):
+        """Whether the stored hash was made at a cost other than the current one."""
+        return hasher.needs_rehash(self.password_hash)
 
     def remove(self):
         """Delete the user from the database."""
@@ -0,0 +1,22 @@
+"""
+Publish the public JSON snapshot once
+Run this to build the first release before pointing a static host at SNAPSHOT_DIR
+"""
+
+import logging
+
+from application import app
+from config.environment import SNAPSHOT_DIR
+from lib.snapshots import publish_snapshot
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+if __name__ == "__main__":
+    if not SNAPSHOT_DIR:
+        raise SystemExit("SNAPSHOT_DIR environment variable must be set")
+    with app.app_context():
+        release = publish_snapshot()
+        logger.info("Current release: %s", release or "unchanged")
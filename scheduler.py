@@ -1,122 +1,209 @@
+import heapq
 import time
 import logging
-from datetime import datetime, timezone, timedelta
+from datetime import timedelta
 from application import app, db
-from models.menus_model import MenusModel
+from config.environment import (
+    SCHEDULER_BATCH_SIZE,
+    SCHEDULER_RESYNC_SECONDS,
+    SCHEDULER_RETRY_SECONDS,
+)
+from lib.cache import content_cache
+from lib.grid_order import crowded_contents, rebalance
+from lib.menu_schedule import (
+    any_due,
+    apply_due,
+    archive_applied,
+    bst_now,
+    pending_due_times,
+)
+from lib.schedule_signal import ScheduleListener
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds between maintenance passes (respacing crowded grids, archiving
+# applied menu versions)
+MAINTENANCE_SECONDS = 3600
+
+# Longest wait between attempts to reopen the schedule listener after an error
+LISTENER_RETRY_MAX_SECONDS = 60
+
 
 def apply_scheduled_updates():
-    """Check for and apply scheduled menu updates that are due"""
+    """Apply the scheduled menu versions that are due, one claimed batch at a time.
+
+    Returns whether due versions are left over: menus another worker had
+    locked are skipped, and that worker may stop before applying them.
+    """
     with app.app_context():
         try:
-            # Get current BST time (convert from UTC)
-            utc_now = datetime.now(timezone.utc)
-            bst_timezone = timezone(timedelta(hours=1))  # BST = UTC+1
-            bst_now = utc_now.astimezone(bst_timezone).replace(
-                tzinfo=None
-            )  # Remove timezone for DB comparison
-
-            # First, get all scheduled updates to show what we're tracking
-            all_scheduled = MenusModel.query.filter(
-                MenusModel.scheduled_at.isnot(None), MenusModel.applied == False
-            ).all()
-
-            # Find updates that are due (comparing BST times)
-            due_scheduled = MenusModel.query.filter(
-                MenusModel.scheduled_at <= bst_now,  # Database stores BST times
-                MenusModel.applied == False,
-                MenusModel.scheduled_at.isnot(None),
-            ).all()
-
-            # Improved logging - BST focused
-            if all_scheduled:
-                logger.info(
-                    f"🕐 Current BST time: {bst_now.strftime('%Y-%m-%d %H:%M:%S')}"
-                )
-                logger.info(
-                    f"📋 Tracking {len(all_scheduled)} pending scheduled updates:"
-                )
-                for menu in all_scheduled:
-                    # Database stores BST times
-                    time_diff = (menu.scheduled_at - bst_now).total_seconds()
-                    if time_diff > 0:
-                        minutes_left = int(time_diff / 60)
-                        logger.info(
-                            "  - %s menu: due in %s minutes (%s)",
-                            menu.menus_type,
-                            minutes_left,
-                            menu.scheduled_at.strftime("%H:%M BST"),
-                        )
-                    else:
-                        logger.info(
-                            "  - %s menu: DUE NOW (%s)",
-                            menu.menus_type,
-                            menu.scheduled_at.strftime("%H:%M BST"),
-                        )
-            else:
-                logger.info("📋 No scheduled updates pending")
+            now = bst_now()
+            applied = 0
+            while True:
+                claimed, menus = apply_due(now, limit=SCHEDULER_BATCH_SIZE)
+                if not claimed:
+                    db.session.rollback()
+                    break
+
+                # Commit each batch, handing its menus back to the other workers
+                db.session.commit()
+                content_cache.bump()
+                applied += len(claimed)
+                for menu_id, menu in menus.items():
+                    logger.info(
+                        "✅ Applied scheduled update for %s menu (ID: %s)",
+                        menu["menus_type"],
+                        menu_id,
+                    )
+                if len(claimed) < SCHEDULER_BATCH_SIZE:
+                    break
 
-            if not due_scheduled:
+            if not applied:
                 logger.info("⏰ No scheduled updates due for application at this time")
-                return
+            else:
+                logger.info(f"🎉 Successfully applied {applied} scheduled updates")
+            return any_due(now)
 
-            logger.info(
-                f"🚀 Found {len(due_scheduled)} scheduled updates ready to apply"
-            )
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"💥 Error in apply_scheduled_updates: {str(e)}")
+            return True
 
-            for menu in due_scheduled:
-                try:
-                    # Apply the scheduled changes
-                    if menu.scheduled_text:
-                        menu.menus_text = menu.scheduled_text
-                    if menu.scheduled_url:
-                        menu.menus_url = menu.scheduled_url
 
-                    # Clear scheduled fields and mark as applied
-                    menu.scheduled_text = None
-                    menu.scheduled_url = None
-                    menu.scheduled_at = None
-                    menu.applied = True
+def rebalance_grids():
+    """Respace the grids whose tiles have run out of room between them"""
+    with app.app_context():
+        try:
+            crowded = crowded_contents()
+            if not crowded:
+                return
 
-                    logger.info(
-                        f"✅ Applied scheduled update for {menu.menus_type} menu (ID: {menu.id})"
-                    )
+            for content_id in crowded:
+                rebalance(content_id)
+            db.session.commit()
+            content_cache.bump()
+            logger.info("Rebalanced grid positions for content %s", crowded)
 
-                except Exception as e:
-                    logger.error(
-                        f"❌ Error applying scheduled update for menu {menu.id}: {str(e)}"
-                    )
-                    continue
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"💥 Error in rebalance_grids: {str(e)}")
 
-            # Commit all changes
-            db.session.commit()
-            logger.info(
-                f"🎉 Successfully applied {len(due_scheduled)} scheduled updates"
-            )
+
+def archive_schedule():
+    """Move long-applied menu versions to the archive table"""
+    with app.app_context():
+        try:
+            moved = archive_applied()
+            if moved:
+                logger.info("Archived %s applied menu versions", moved)
 
         except Exception as e:
             db.session.rollback()
-            logger.error(f"💥 Error in apply_scheduled_updates: {str(e)}")
+            logger.error(f"💥 Error in archive_schedule: {str(e)}")
+
+
+class DueHeap:
+    """Min-heap of upcoming due times, each kept once"""
+
+    def __init__(self):
+        self._heap = []
+        self._queued = set()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, due_at):
+        if due_at not in self._queued:
+            self._queued.add(due_at)
+            heapq.heappush(self._heap, due_at)
+
+    def reset(self, due_times):
+        self._heap = sorted(set(due_times))
+        self._queued = set(self._heap)
+
+    def seconds_until_next(self, now):
+        """Seconds until the earliest due time, or None when nothing is queued"""
+        if not self._heap:
+            return None
+        return (self._heap[0] - now).total_seconds()
+
+    def pop_due(self, now):
+        """Remove and return whether any due time has been reached"""
+        popped = False
+        while self._heap and self._heap[0] <= now:
+            self._queued.discard(heapq.heappop(self._heap))
+            popped = True
+        return popped
+
+
+def reopen_listener(listener, failures):
+    """Replace ``listener`` after an error, backing off until a new one connects"""
+    listener.close()
+    while True:
+        time.sleep(min(2**failures, LISTENER_RETRY_MAX_SECONDS))
+        try:
+            with app.app_context():
+                listener = ScheduleListener()
+        except Exception as e:
+            logger.error(f"💥 Could not reopen the schedule listener: {str(e)}")
+            failures += 1
+            continue
+        logger.info("🔌 Schedule listener reconnected")
+        return listener
 
 
 def run_scheduler():
-    """Run the scheduler that checks for updates every minute"""
+    """Sleep until the next scheduled update is due, waking early when notified"""
     logger.info("🚀 Starting BST menu update scheduler...")
 
+    with app.app_context():
+        listener = ScheduleListener()
+    due = DueHeap()
+    # Resync right away: updates due while the scheduler was down apply at once.
+    next_resync = next_maintenance = time.monotonic()
+    failures = 0
+
     while True:
         try:
-            apply_scheduled_updates()
-            time.sleep(60)  # Wait 60 seconds (1 minute)
+            now = time.monotonic()
+            if now >= next_resync:
+                with app.app_context():
+                    due.reset(pending_due_times())
+                logger.info("📋 %s scheduled update times pending", len(due))
+                next_resync = now + SCHEDULER_RESYNC_SECONDS
+            if now >= next_maintenance:
+                rebalance_grids()
+                archive_schedule()
+                next_maintenance = now + MAINTENANCE_SECONDS
+
+            if due.pop_due(bst_now()) and apply_scheduled_updates():
+                # Try again shortly rather than waiting for the next resync, in
+                # case the worker holding the rest stops before applying them.
+                retry_at = bst_now() + timedelta(seconds=SCHEDULER_RETRY_SECONDS)
+                logger.info("🔁 Due updates still pending, retrying at %s", retry_at)
+                due.push(retry_at)
+
+            timeout = min(next_resync, next_maintenance) - time.monotonic()
+            until_due = due.seconds_until_next(bst_now())
+            if until_due is not None:
+                timeout = min(timeout, until_due)
+            for due_at in listener.wait(timeout):
+                logger.info("🕐 Update scheduled for %s BST", due_at)
+                due.push(due_at)
+            failures = 0
         except KeyboardInterrupt:
             logger.info("⏹️  Scheduler stopped by user")
+            listener.close()
             break
         except Exception as e:
             logger.error(f"💥 Unexpected error in scheduler: {str(e)}")
-            time.sleep(60)  # Continue after error
+            # A dropped LISTEN connection fails on every wait: replace the
+            # listener, and resync for the wakeups missed meanwhile.
+            failures += 1
+            listener = reopen_listener(listener, failures)
+            next_resync = time.monotonic()
 
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ from models.content_model import ContentModel
 from models.carousel_model import CarouselModel
 from models.menus_model import MenusModel
 from models.grid_model import GridModel
+from lib.grid_order import POSITION_GAP
 
 
 seed_password_superadmin = os.getenv("SEED_PASSWORD_SUPERADMIN")
@@ -199,7 +200,7 @@ with app.app_context():
                 "&amp;w=1950&amp;q=80"
             ),
             content=Content,
-            position=1,
+            position=1 * POSITION_GAP,
             width=1020,
             height=680,
         )
@@ -210,7 +211,7 @@ with app.app_context():
                 "&amp;auto=format&amp;fit=crop&amp;w=927&amp;q=80"
             ),
             content=Content,
-            position=2,
+            position=2 * POSITION_GAP,
             width=446,
             height=794,
         )
@@ -221,7 +222,7 @@ with app.app_context():
                 "&amp;auto=format&amp;fit=crop&amp;w=2940&amp;q=80"
             ),
             content=Content,
-            position=3,
+            position=3 * POSITION_GAP,
             width=1020,
             height=680,
         )
@@ -232,7 +233,7 @@ with app.app_context():
                 "&amp;auto=format&amp;fit=crop&amp;w=687&amp;q=80"
             ),
             content=Content,
-            position=4,
+            position=4 * POSITION_GAP,
             width=529,
             height=794,
         )
@@ -243,14 +244,14 @@ with app.app_context():
                 "&amp;auto=format&amp;fit=crop&amp;w=800&amp;q=80"
             ),
             content=Content,
-            position=5,
+            position=5 * POSITION_GAP,
             width=1019,
             height=680,
         )
         Grid_six = GridModel(
             grid_url="https://docs.material-tailwind.com/img/team-3.jpg",
             content=Content,
-            position=6,
+            position=6 * POSITION_GAP,
             width=400,
             height=400,
         )
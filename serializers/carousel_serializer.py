@@ -7,3 +7,4 @@ class CarouselSerializer(SQLAlchemyAutoSchema):
         model = CarouselModel
         load_instance = True
         include_fk = True
+        dump_only = ("updated_at",)
@@ -13,3 +13,4 @@ class ContentSerializer(marshy.SQLAlchemyAutoSchema):
     class Meta:
         model = ContentModel
         load_instance = True
+        dump_only = ("updated_at",)
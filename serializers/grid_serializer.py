@@ -7,3 +7,4 @@ class GridSerializer(SQLAlchemyAutoSchema):
         model = GridModel
         load_instance = True
         include_fk = True
+        dump_only = ("updated_at",)
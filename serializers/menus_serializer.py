@@ -7,3 +7,4 @@ class MenusSerializer(SQLAlchemyAutoSchema):
         model = MenusModel
         load_instance = True
         include_fk = True
+        dump_only = ("updated_at",)
@@ -5,21 +5,41 @@ from application import marshy
 from models.users_model import UserModel
 
 
+# Password strength rules, checked in order; compiled once at import.
+PASSWORD_RULES = [
+    (
+        re.compile(r"\A.{8,}", re.S),
+        "Password needs to be a minimum of 8 characters long",
+    ),
+    (
+        re.compile(r"\A.{0,20}\Z", re.S),
+        "Password needs to be a maximum of 20 characters long",
+    ),
+    (re.compile("[a-z]"), "Password needs to contain at least 1 lowercase letter"),
+    (re.compile("[A-Z]"), "Password needs to contain at least 1 uppercase letter"),
+    (re.compile("[0-9]"), "Password needs to contain at least 1 digit"),
+    (
+        re.compile("[!@#$%&*]"),
+        "Password needs to contain at least 1 special character",
+    ),
+]
+
+
+def password_problem(password):
+    """The first strength rule ``password`` breaks, or None if it is strong enough."""
+    if not isinstance(password, str):
+        return "Password needs to be a minimum of 8 characters long"
+    for pattern, message in PASSWORD_RULES:
+        if not pattern.search(password):
+            return message
+    return None
+
+
 def validate_password(password):
-    """Validate the password against the stored hash."""
-    spec_chart = ["!", "@", "#", "$", "%", "&", "*"]
-    if len(password) < 8:
-        raise ValidationError("Password needs to be a minimum of 8 characters long")
-    if len(password) > 20:
-        raise ValidationError("Password needs to be a maximum of 20 characters long")
-    if not re.search("[a-z]", password):
-        raise ValidationError("Password needs to contain at least 1 lowercase letter")
-    if not re.search("[A-Z]", password):
-        raise ValidationError("Password needs to contain at least 1 uppercase letter")
-    if not re.search("[0-9]", password):
-        raise ValidationError("Password needs to contain at least 1 digit")
-    if not any(char in spec_chart for char in password):
-        raise ValidationError("Password needs to contain at least 1 special character")
+    """Marshmallow validator enforcing the password strength rules."""
+    problem = password_problem(password)
+    if problem:
+        raise ValidationError(problem)
 
 
 class UserSerializer(marshy.SQLAlchemyAutoSchema):
@@ -33,4 +53,5 @@ class UserSerializer(marshy.SQLAlchemyAutoSchema):
         model = UserModel
         load_instance = True
         load_only = ("password", "password_hash", "password_confirmation")
-        dump_only = ("role",)
+        dump_only = ("role", "updated_at")
+        exclude = ("token_version",)
@@ -0,0 +1,17 @@
+"""Point the app at a scratch database before any test imports it.
+
+config.environment reads the database URL at import time. TEST_DATABASE_URL
+selects the database; without it the tests run on a throwaway SQLite file,
+and those that need Postgres skip.
+"""
+
+import os
+import tempfile
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL") or "sqlite:///" + os.path.join(
+    tempfile.mkdtemp(), "test.db"
+)
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ["DATABASE_PUBLIC_URL"] = TEST_DATABASE_URL
+os.environ["CACHE_URL"] = "memory://"
+os.environ.setdefault("SECRET", "test-secret")
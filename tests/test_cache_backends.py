@@ -0,0 +1,105 @@
+"""Cache backends: the in-process LRU and Redis, on a fakeredis server."""
+
+import time
+
+import fakeredis
+import pytest
+
+from application import app
+from lib import cache_backends
+from lib.cache import PayloadCache
+from lib.cache_backends import LocalLRUBackend, RedisBackend, get_cache_backend
+
+REDIS_URL = "redis://localhost:6379/0"
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    """Route every RedisBackend to one in-memory server, as workers share one."""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        cache_backends.redis.Redis,
+        "from_url",
+        lambda url: fakeredis.FakeRedis(server=server),
+    )
+    return server
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return LocalLRUBackend()
+    request.getfixturevalue("redis_server")
+    return get_cache_backend(REDIS_URL)
+
+
+def test_get_cache_backend_picks_by_scheme(redis_server):
+    assert isinstance(get_cache_backend("memory://"), LocalLRUBackend)
+    assert isinstance(get_cache_backend(REDIS_URL), RedisBackend)
+    with pytest.raises(ValueError):
+        get_cache_backend("memcached://localhost")
+
+
+def test_get_set_delete(backend):
+    assert backend.get("key") is None
+    backend.set("key", b"value")
+    assert backend.get("key") == b"value"
+    backend.set("key", b"other")
+    assert backend.get("key") == b"other"
+    backend.delete("key", "missing")
+    assert backend.get("key") is None
+
+
+def test_set_expires_after_ttl(backend):
+    backend.set("short", b"value", ttl=1)
+    backend.set("forever", b"value")
+    assert backend.get("short") == b"value"
+    time.sleep(1.1)
+    assert backend.get("short") is None
+    assert backend.get("forever") == b"value"
+
+
+def test_counter_and_incr(backend):
+    assert backend.counter("version") == 0
+    assert backend.incr("version") == 1
+    assert backend.incr("version") == 2
+    assert backend.counter("version") == 2
+    assert backend.counter("other") == 0
+
+
+def test_lru_evicts_least_recently_used():
+    backend = LocalLRUBackend(max_entries=2)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    backend.get("a")  # "b" is now the least recently used
+    backend.set("c", b"3")
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1"
+    assert backend.get("c") == b"3"
+
+
+def test_lru_never_evicts_counters():
+    backend = LocalLRUBackend(max_entries=1)
+    backend.incr("version")
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    assert backend.counter("version") == 1
+
+
+def test_redis_keys_are_prefixed(redis_server):
+    get_cache_backend(REDIS_URL).set("key", b"value")
+    assert fakeredis.FakeRedis(server=redis_server).get("chezflo:key") == b"value"
+
+
+def test_bump_in_one_worker_invalidates_the_other(redis_server):
+    web = PayloadCache("test", store=get_cache_backend(REDIS_URL))
+    scheduler = PayloadCache("test", store=get_cache_backend(REDIS_URL))
+
+    with app.app_context():
+        entry = web.set("page", {"title": "old"}, web.version)
+    assert scheduler.get("page").body == entry.body
+
+    scheduler.bump()
+
+    assert web.get("page") is None
+    assert web.version == scheduler.version == 1
@@ -0,0 +1,121 @@
+"""If-Modified-Since must stop matching once a row behind a response is deleted."""
+
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import update
+
+from application import app, db, limiter
+from lib.bulk import bulk_delete
+from lib.cache import content_cache
+from models import CarouselModel, ContentModel, GridModel, MenusModel
+from models.mixins import utcnow
+
+pytestmark = pytest.mark.filterwarnings("ignore::sqlalchemy.exc.LegacyAPIWarning")
+
+
+@pytest.fixture(scope="module")
+def client():
+    limiter.enabled = False
+    with app.app_context():
+        db.create_all()
+    return app.test_client()
+
+
+@pytest.fixture
+def page():
+    """A content row with two of each child, all last changed an hour ago."""
+    with app.app_context():
+        content = ContentModel(
+            **{
+                column.name: "test"
+                for column in ContentModel.__table__.columns
+                if isinstance(column.type, db.Text)
+            }
+        )
+        content.carousels = [CarouselModel(carousel_url=f"c{i}") for i in range(2)]
+        content.menus = [
+            MenusModel(menus_type=f"m{i}", menus_text="t", menus_url="u")
+            for i in range(2)
+        ]
+        content.grid = [
+            GridModel(grid_url=f"g{i}", position=i, height=1, width=1) for i in range(2)
+        ]
+        db.session.add(content)
+        db.session.commit()
+
+        an_hour_ago = utcnow() - timedelta(hours=1)
+        # Children first: writing them touches the content row.
+        for model in (CarouselModel, MenusModel, GridModel, ContentModel):
+            db.session.execute(update(model).values(updated_at=an_hour_ago))
+        db.session.commit()
+        content_cache.bump()
+
+        yield {
+            "id": content.id,
+            "carousel": [row.id for row in content.carousels],
+            "menus": [row.id for row in content.menus],
+            "grid": [row.id for row in content.grid],
+        }
+
+        for model in (CarouselModel, MenusModel, GridModel):
+            db.session.query(model).filter_by(content_id=content.id).delete()
+        db.session.query(ContentModel).filter_by(id=content.id).delete()
+        db.session.commit()
+
+
+def get(client, path, last_modified=None):
+    headers = {"If-Modified-Since": last_modified} if last_modified else {}
+    return client.get(path, headers=headers, base_url="https://localhost")
+
+
+def delete_carousels(client, page):
+    client.delete(
+        f"/api/content/{page['id']}/carousel?ids={page['carousel'][0]}",
+        base_url="https://localhost",
+    )
+
+
+def delete_carousel(client, page):
+    client.delete(
+        f"/api/content/{page['id']}/carousel/{page['carousel'][0]}",
+        base_url="https://localhost",
+    )
+
+
+def delete_grids(client, page):
+    client.delete(
+        f"/api/content/{page['id']}/grid?ids={page['grid'][0]}",
+        base_url="https://localhost",
+    )
+
+
+def delete_menus(client, page):
+    with app.app_context():
+        bulk_delete(MenusModel, page["menus"][:1])
+        db.session.commit()
+    content_cache.bump()
+
+
+@pytest.mark.parametrize(
+    "path, delete",
+    [
+        ("/api/content", delete_carousels),
+        ("/api/content/{id}/bundle", delete_carousels),
+        ("/api/content/{id}/carousel", delete_carousels),
+        ("/api/content/{id}/carousel", delete_carousel),
+        ("/api/content/{id}/grid", delete_grids),
+        ("/api/content/{id}/menus", delete_menus),
+    ],
+)
+def test_delete_invalidates_if_modified_since(client, page, path, delete):
+    path = path.format(id=page["id"])
+    first = get(client, path)
+    assert first.status_code == HTTPStatus.OK
+    last_modified = first.headers["Last-Modified"]
+    assert get(client, path, last_modified).status_code == HTTPStatus.NOT_MODIFIED
+
+    delete(client, page)
+
+    assert get(client, path, last_modified).status_code == HTTPStatus.OK
@@ -0,0 +1,45 @@
+"""Batched token revocation."""
+
+import pytest
+from sqlalchemy import event
+
+from application import app, db
+from lib.revocations import REVOKE_ALL, revocations
+from models.revocation_model import RevocationModel
+
+
+@pytest.fixture
+def session():
+    with app.app_context():
+        db.create_all()
+        yield db.session
+        db.session.query(RevocationModel).delete()
+        db.session.commit()
+
+
+def test_revoke_many_costs_two_statements(session):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        revocations.revoke_many(range(1000, 1050), REVOKE_ALL)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    assert [statement.split()[0] for statement in statements] == ["DELETE", "INSERT"]
+    assert session.query(RevocationModel).count() == 50
+
+
+def test_revoke_many_applies_on_commit_only(session):
+    revocations.revoke_many([2000, 2001], REVOKE_ALL)
+    session.rollback()
+    assert not revocations.is_revoked(2000, 1)
+
+    revocations.revoke_many([2000, 2001], REVOKE_ALL)
+    session.commit()
+    assert revocations.is_revoked(2000, 1)
+    assert revocations.is_revoked(2001, 1)
+    assert not revocations.is_revoked(2002, 1)
@@ -0,0 +1,174 @@
+"""Concurrent scheduler workers against a real Postgres database.
+
+Claiming locks menus with ``SELECT ... FOR UPDATE SKIP LOCKED``, which only
+Postgres implements, so these tests run only when TEST_DATABASE_URL points at
+a scratch Postgres database, e.g.:
+    TEST_DATABASE_URL=postgresql://localhost/menu_test python -m pytest tests
+
+Each worker is a thread with its own app context, and so its own session and
+connection; the workers race in the database, as separate processes would.
+"""
+
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pytest
+
+if not os.environ["DATABASE_URL"].startswith(("postgres://", "postgresql")):
+    pytest.skip(
+        "TEST_DATABASE_URL must point at a scratch Postgres database",
+        allow_module_level=True,
+    )
+
+from sqlalchemy import func, insert  # noqa: E402
+
+from application import app, db  # noqa: E402
+from lib.menu_schedule import any_due, apply_due, bst_now  # noqa: E402
+from models import ContentModel, MenusModel  # noqa: E402
+from models.menu_schedule_model import MenuScheduleModel  # noqa: E402
+
+WORKERS = 8
+MENUS = 2000
+VERSIONS = 20
+BATCH = 100
+
+
+@pytest.fixture(scope="module", autouse=True)
+def schema():
+    with app.app_context():
+        db.create_all()
+    yield
+
+
+@pytest.fixture
+def due_menus():
+    """``MENUS`` menus with ``VERSIONS`` due versions each, oldest first."""
+    with app.app_context():
+        content = ContentModel(
+            **{
+                column.name: "test"
+                for column in ContentModel.__table__.columns
+                if isinstance(column.type, db.Text)
+            }
+        )
+        content.menus = [
+            MenusModel(menus_type=f"test-{i}", menus_text="v-", menus_url="test")
+            for i in range(MENUS)
+        ]
+        db.session.add(content)
+        db.session.commit()
+        content_id = content.id
+        menu_ids = [menu.id for menu in content.menus]
+
+        now = bst_now()
+        db.session.execute(
+            insert(MenuScheduleModel),
+            [
+                {
+                    "menu_id": menu_id,
+                    "menus_text": f"v{version}",
+                    "due_at": now - timedelta(seconds=VERSIONS - version),
+                }
+                for menu_id in menu_ids
+                for version in range(VERSIONS)
+            ],
+        )
+        db.session.commit()
+
+    yield content_id, now
+
+    with app.app_context():
+        db.session.query(MenuScheduleModel).filter(
+            MenuScheduleModel.menu_id.in_(menu_ids)
+        ).delete(synchronize_session=False)
+        db.session.query(MenusModel).filter_by(content_id=content_id).delete()
+        db.session.query(ContentModel).filter_by(id=content_id).delete()
+        db.session.commit()
+
+
+def run_workers(count, work):
+    """Run ``work(index)`` on ``count`` threads released together."""
+    start = threading.Barrier(count)
+
+    def worker(index):
+        start.wait()
+        with app.app_context():
+            return work(index)
+
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(worker, range(count)))
+
+
+def drain(now, content_id, crash_after=None):
+    """Claim and commit batches like the scheduler; return the ids applied.
+
+    Stops once nothing due is left, retrying while other workers hold some
+    menus. With ``crash_after``, the worker rolls back its next batch after
+    that many, as a worker dying mid-batch would.
+    """
+    applied = []
+    batches = 0
+    while True:
+        claimed, _ = apply_due(now, content_id, limit=BATCH)
+        if crash_after is not None and batches == crash_after and claimed:
+            db.session.rollback()
+            return applied
+        db.session.commit()
+        applied.extend(claimed)
+        batches += 1
+        if not claimed and not any_due(now):
+            return applied
+
+
+def assert_applied_once(content_id, results):
+    claims = Counter(version_id for ids in results for version_id in ids)
+    duplicates = [version_id for version_id, seen in claims.items() if seen > 1]
+    assert duplicates == []
+    assert len(claims) == MENUS * VERSIONS
+
+    pending = (
+        db.session.query(func.count(MenuScheduleModel.id))
+        .join(MenusModel, MenusModel.id == MenuScheduleModel.menu_id)
+        .filter(
+            MenusModel.content_id == content_id,
+            MenuScheduleModel.applied.is_(False),
+        )
+        .scalar()
+    )
+    assert pending == 0
+
+    stale = (
+        db.session.query(func.count(MenusModel.id))
+        .filter(
+            MenusModel.content_id == content_id,
+            MenusModel.menus_text != f"v{VERSIONS - 1}",
+        )
+        .scalar()
+    )
+    assert stale == 0
+
+
+def test_workers_apply_each_version_once(due_menus):
+    content_id, now = due_menus
+
+    results = run_workers(WORKERS, lambda index: drain(now, content_id))
+
+    with app.app_context():
+        assert_applied_once(content_id, results)
+    # Claiming did not serialize behind one worker.
+    assert sum(1 for ids in results if ids) > 1
+
+
+def test_versions_of_a_crashed_worker_are_applied_by_the_others(due_menus):
+    content_id, now = due_menus
+
+    results = run_workers(
+        WORKERS,
+        lambda index: drain(now, content_id, crash_after=1 if index == 0 else None),
+    )
+
+    with app.app_context():
+        assert_applied_once(content_id, results)